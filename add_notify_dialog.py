@@ -2,6 +2,7 @@ import os
 from PyQt6 import QtWidgets, QtGui, QtCore
 import uuid
 from utils import save_json, load_json
+from icon_cache import get_icon, get_pixmap
 import datetime
 import calendar
 
@@ -12,23 +13,54 @@ class AddNotifyDialog(QtWidgets.QDialog):
         self.config_static = config_static
         self.config_dynamic = config_dynamic
         self.data_manager = data_manager
-        self.reminder_data = reminder_data
+        self.reminder_data = None
         self.at_config = config_static["add_notify_dialog"]
         self.updating = False
 
+        window_icon = get_icon(self.config_static["paths"]["add_notify_window_icon"])
+        if window_icon is not None:
+            self.setWindowIcon(window_icon)
+
+        self.setStyleSheet(self.at_config["stylesheet"])
+
+        self.setup_ui()
+        self.restore_position()
+        self.reset(reminder_data)
+
+    def reset(self, reminder_data=None):
+        """Prepare the dialog for adding a new reminder or editing reminder_data (the dialog is reused)"""
+        self.reminder_data = reminder_data
         if reminder_data:
             self.setWindowTitle(self.at_config.get("edit_window_title", "Edit Reminder"))
         else:
             self.setWindowTitle(self.at_config.get("window_title", "Add Reminder"))
+        self.ok_button.setText(self.at_config.get("save_button", "Save") if reminder_data else self.at_config.get("ok_button", "OK"))
 
-        if self.config_static["paths"]["add_notify_window_icon"]:
-            self.setWindowIcon(QtGui.QIcon(self.config_static["paths"]["add_notify_window_icon"]))
+        now = datetime.datetime.now() + datetime.timedelta(minutes=5)
+        self.text_input.clear()
+        self.time_input.setTime(QtCore.QTime(now.hour, now.minute))
+        self.icon_combo.setCurrentIndex(0)
+        self.updating = True
+        try:
+            for btn in self.recurrence_buttons.values():
+                btn.setChecked(False)
+        finally:
+            self.updating = False
+        self.date_widget.setVisible(False)
+        self.weekly_widget.setVisible(False)
+        self.monthly_widget.setVisible(False)
+        self.yearly_widget.setVisible(False)
+        self.date_input.setDate(QtCore.QDate(now.year, now.month, now.day))
+        for btn in self.day_buttons.values():
+            btn.setChecked(False)
+        self.monthly_day_input.setValue(now.day)
+        self.yearly_month_input.setCurrentIndex(now.month - 1)
+        self.yearly_day_input.setValue(now.day)
 
-        self.setStyleSheet(self.at_config["stylesheet"])
+        if reminder_data:
+            self.load_reminder(reminder_data)
+        self.text_input.setFocus()
 
-        self.setup_ui()
-        self.restore_position()
-        
         # Reload backlog to ensure we have the latest data
         self.reload_backlog()
 
@@ -205,8 +237,9 @@ class AddNotifyDialog(QtWidgets.QDialog):
         self.icon_combo = QtWidgets.QComboBox()
         self.icon_combo.addItem(self.at_config["no_icon_text"], "")
         for icon in self.at_config["notify_icons"]:
-            icon_pixmap = QtGui.QPixmap(icon["path"]).scaled(12, 12, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
-            self.icon_combo.addItem(QtGui.QIcon(icon_pixmap), icon["name"], icon["path"])
+            icon_pixmap = get_pixmap(icon["path"], 12)
+            self.icon_combo.addItem(QtGui.QIcon(icon_pixmap) if icon_pixmap is not None else QtGui.QIcon(),
+                                    icon["name"], icon["path"])
 
         form_layout.addRow(self.at_config["notify_text_label"], self.text_input)
         form_layout.addRow(self.at_config["notify_time_label"], self.time_input)
@@ -286,37 +319,10 @@ class AddNotifyDialog(QtWidgets.QDialog):
         self.yearly_month_input.currentIndexChanged.connect(self.update_yearly_day_range)
         self.update_yearly_day_range()
 
-        if self.reminder_data:
-            self.text_input.setText(self.reminder_data.get("text"))
-            if self.reminder_data.get("time"):
-                time_parts = self.reminder_data["time"].split(":")
-                self.time_input.setTime(QtCore.QTime(int(time_parts[0]), int(time_parts[1])))
-            recurrence_type = self.reminder_data.get("recurrence_type")
-            normalized_rec_type = next((rt for rt in self.at_config["recurrence_types"] if rt.lower() == recurrence_type.lower()), "Daily")
-            self.recurrence_buttons[normalized_rec_type].setChecked(True)
-            self.update_recurrence(normalized_rec_type)
-            if normalized_rec_type == "One-time" and self.reminder_data.get("date"):
-                date_parts = self.reminder_data["date"].split("-")
-                self.date_input.setDate(QtCore.QDate(int(date_parts[0]), int(date_parts[1]), int(date_parts[2])))
-            elif normalized_rec_type == "Weekly" and "weekly_days" in self.reminder_data:
-                for idx, btn in self.day_buttons.items():
-                    btn.setChecked(idx in self.reminder_data["weekly_days"])
-            elif normalized_rec_type == "Monthly" and "monthly_day" in self.reminder_data:
-                self.monthly_day_input.setValue(self.reminder_data["monthly_day"])
-            elif normalized_rec_type == "Yearly" and "yearly_month" in self.reminder_data and "yearly_day" in self.reminder_data:
-                self.yearly_month_input.setCurrentIndex(self.reminder_data["yearly_month"] - 1)
-                self.yearly_day_input.setValue(self.reminder_data["yearly_day"])
-            icon_path = self.reminder_data.get("icon")
-            for i in range(self.icon_combo.count()):
-                if self.icon_combo.itemData(i) == icon_path:
-                    self.icon_combo.setCurrentIndex(i)
-                    break
-
         main_layout.addStretch()
 
         buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Ok | QtWidgets.QDialogButtonBox.StandardButton.Cancel)
-        ok_btn = buttons.button(QtWidgets.QDialogButtonBox.StandardButton.Ok)
-        ok_btn.setText(self.at_config.get("save_button", "Save") if self.reminder_data else self.at_config.get("ok_button", "OK"))
+        self.ok_button = buttons.button(QtWidgets.QDialogButtonBox.StandardButton.Ok)
         cancel_btn = buttons.button(QtWidgets.QDialogButtonBox.StandardButton.Cancel)
         cancel_btn.setText(self.at_config.get("cancel_button", "Cancel"))
         buttons.accepted.connect(self.accept)
@@ -325,6 +331,33 @@ class AddNotifyDialog(QtWidgets.QDialog):
 
         self.setLayout(main_layout)
 
+    def load_reminder(self, reminder_data):
+        """Fill the inputs from an existing reminder"""
+        self.text_input.setText(reminder_data.get("text"))
+        if reminder_data.get("time"):
+            time_parts = reminder_data["time"].split(":")
+            self.time_input.setTime(QtCore.QTime(int(time_parts[0]), int(time_parts[1])))
+        recurrence_type = reminder_data.get("recurrence_type")
+        normalized_rec_type = next((rt for rt in self.at_config["recurrence_types"] if rt.lower() == recurrence_type.lower()), "Daily")
+        self.recurrence_buttons[normalized_rec_type].setChecked(True)
+        self.update_recurrence(normalized_rec_type)
+        if normalized_rec_type == "One-time" and reminder_data.get("date"):
+            date_parts = reminder_data["date"].split("-")
+            self.date_input.setDate(QtCore.QDate(int(date_parts[0]), int(date_parts[1]), int(date_parts[2])))
+        elif normalized_rec_type == "Weekly" and "weekly_days" in reminder_data:
+            for idx, btn in self.day_buttons.items():
+                btn.setChecked(idx in reminder_data["weekly_days"])
+        elif normalized_rec_type == "Monthly" and "monthly_day" in reminder_data:
+            self.monthly_day_input.setValue(reminder_data["monthly_day"])
+        elif normalized_rec_type == "Yearly" and "yearly_month" in reminder_data and "yearly_day" in reminder_data:
+            self.yearly_month_input.setCurrentIndex(reminder_data["yearly_month"] - 1)
+            self.yearly_day_input.setValue(reminder_data["yearly_day"])
+        icon_path = reminder_data.get("icon")
+        for i in range(self.icon_combo.count()):
+            if self.icon_combo.itemData(i) == icon_path:
+                self.icon_combo.setCurrentIndex(i)
+                break
+
     def on_text_input_click(self, a0):
         """Handler for clicking on the text input field to show suggestions"""
         QtWidgets.QLineEdit.mousePressEvent(self.text_input, a0)
@@ -454,7 +487,10 @@ class AddNotifyDialog(QtWidgets.QDialog):
             "width": size.width(),
             "height": size.height()
         }
-        save_json("config_dynamic.json", self.config_dynamic)
+        if self.data_manager:
+            self.data_manager.update_config_dynamic(self.config_dynamic)
+        else:
+            save_json("config_dynamic.json", self.config_dynamic)
 
     def closeEvent(self, event):
         self.save_position()
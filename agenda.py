@@ -0,0 +1,103 @@
+import datetime
+import heapq
+from typing import Iterable, Iterator, Optional, Tuple, Any
+from reminder_check import ALL_WEEKDAYS, CompiledReminder
+
+Occurrence = Tuple[datetime.datetime, Any]
+
+# Types with a schedule; other reminders are always due and have no occurrences
+RECURRENCE_TYPES = ("once", "daily", "weekly", "monthly", "yearly")
+
+
+def _compiled(reminder) -> CompiledReminder:
+    return reminder if isinstance(reminder, CompiledReminder) else CompiledReminder(reminder)
+
+
+def iter_occurrences(reminder, start: datetime.datetime, end: datetime.datetime) -> Iterator[datetime.datetime]:
+    """
+    Fire times of one reminder in [start, end), in time order, as the checker
+    would produce them running from start with the current completion state:
+    each occurrence is CompiledReminder.next_fire_time() after the previous one,
+    with the reminder completed at that occurrence. Periods already completed are
+    skipped, and a reminder that is already due (an overdue one-time reminder, or
+    a recurring one whose time passed in the current period) fires at start.
+    After their first occurrence, daily and weekly reminders step day by day.
+    """
+    compiled = _compiled(reminder)
+    recurrence_type = compiled.recurrence_type
+    if recurrence_type not in RECURRENCE_TYPES:
+        return
+    moment = compiled.next_fire_time(start)
+    if recurrence_type in ("daily", "weekly") and moment is not None and moment < end:
+        yield moment
+        yield from _iter_days(compiled, moment, end)
+        return
+    state = None
+    while moment is not None and moment < end:
+        yield moment
+        if recurrence_type == "once":
+            return
+        completion = {"completed_at": moment.isoformat()}
+        if state is None:
+            state = compiled.with_completion(completion)
+        else:
+            # Private copy: completing it in place saves copying the record per occurrence
+            state._set_completion(completion)
+        moment = state.next_fire_time(moment)
+
+
+def _iter_days(compiled: CompiledReminder, fired: datetime.datetime,
+               end: datetime.datetime) -> Iterator[datetime.datetime]:
+    """
+    Occurrences of a daily/weekly reminder after it fired at `fired`: completed
+    that day, it is due on every following scheduled day at its due minute.
+    Stepping by day gives what next_fire_time() would, without completing a copy
+    of the reminder at every occurrence.
+    """
+    due = datetime.time(compiled.due_minute // 60, compiled.due_minute % 60)
+    mask = compiled.weekday_mask if compiled.recurrence_type == "weekly" else ALL_WEEKDAYS
+    one_day = datetime.timedelta(days=1)
+    day = fired.date()
+    weekday = day.weekday()
+    while True:
+        day += one_day
+        weekday = (weekday + 1) % 7
+        if mask >> weekday & 1:
+            moment = datetime.datetime.combine(day, due)
+            if moment >= end:
+                return
+            yield moment
+
+
+def iter_agenda(reminders: Iterable, start: datetime.datetime, end: datetime.datetime) -> Iterator[Occurrence]:
+    """
+    (datetime, reminder_id) occurrences of all reminders in [start, end), merged in
+    time order with a heap. Streams: only the next occurrence of each reminder is
+    held in memory. Simultaneous occurrences keep the reminders' order.
+    """
+    heap = []
+    for seq, reminder in enumerate(reminders):
+        compiled = _compiled(reminder)
+        occurrences = iter_occurrences(compiled, start, end)
+        moment = next(occurrences, None)
+        if moment is not None:
+            heap.append((moment, seq, compiled.id, occurrences))
+    heapq.heapify(heap)
+    while heap:
+        moment, seq, reminder_id, occurrences = heap[0]
+        yield moment, reminder_id
+        moment = next(occurrences, None)
+        if moment is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (moment, seq, reminder_id, occurrences))
+
+
+def next_occurrence(reminder, after: datetime.datetime,
+                    horizon: datetime.timedelta = datetime.timedelta(days=800)) -> Optional[datetime.datetime]:
+    """First scheduled fire time at or after `after`, None if there is none within the horizon"""
+    compiled = _compiled(reminder)
+    if compiled.recurrence_type not in RECURRENCE_TYPES:
+        return None
+    moment = compiled.next_fire_time(after)
+    return moment if moment is not None and moment < after + horizon else None
@@ -1,4 +1,5 @@
 import sys
+import time
 import datetime
 import os
 from PyQt6 import QtWidgets, QtGui, QtCore
@@ -8,56 +9,101 @@ from fullscreen_reminder import FullscreenReminder
 from add_notify_dialog import AddNotifyDialog
 from notify_list_dialog import NotifyListDialog
 from settings_dialog import SettingsDialog
-from reminder_check import ReminderChecker
-import winreg
+from scheduler import ReminderEngine
+from notification_queue import NotificationQueue, MERGE, SERIAL
+from clock import SystemClock
+import icon_cache
 
 class NotifyApp(QtWidgets.QSystemTrayIcon):
-    def __init__(self, app, config_static, config_dynamic, main_window):
+    # Emitted from the engine / data manager threads, delivered on the GUI thread
+    notifications_ready = QtCore.pyqtSignal()
+    reminders_changed = QtCore.pyqtSignal(object)
+
+    def __init__(self, app, config_static, config_dynamic, main_window, clock=None):
         super().__init__(self._get_valid_icon(config_static["paths"]["tray_icon"]))
         self.app = app
         self.config_static = config_static
         self.config_dynamic = config_dynamic
         self.main_window = main_window
+        self.clock = clock or SystemClock()
         
         # Initialize centralized data manager
-        self.data_manager = DataManager(config_static)
+        self.data_manager = DataManager(config_static, clock=self.clock)
+        # Decode the icons of the config and of all reminders off the GUI thread
+        icon_cache.get_cache().warm_up(icon_cache.config_icon_paths(config_static) +
+                                       [reminder.get("icon") for reminder in self.data_manager.get_reminders()])
         
-        # Subscribe to data changes for UI updates
-        self.data_manager.subscribe('reminders', self._on_reminders_changed)
-        self.data_manager.subscribe('completed_today', self._on_completed_changed)
+        # Subscribe to data changes for UI updates. Changes may come from the engine
+        # thread, the signal hands them over to the GUI thread
+        self.reminders_changed.connect(self._on_reminders_changed)
+        self.data_manager.subscribe('reminders', self.reminders_changed.emit)
+        # Completions change the completed/next state of listed rows
+        self.data_manager.subscribe('completed', lambda _: self.reminders_changed.emit(self.data_manager.get_lazy_snapshot('reminders')))
         
+        # GUI-free scheduling engine: fires due reminders on its own worker thread,
+        # the tray is one of its subscribers
+        self.check_interval_ms = config_dynamic["settings_dialog"]["reminder_check_interval_sec"] * 1000
+        heartbeat_sec = config_static.get("scheduler", {}).get("heartbeat_interval_sec", 600)
+        self.engine = ReminderEngine(self.data_manager, check_interval=datetime.timedelta(milliseconds=self.check_interval_ms),
+                                     clock=self.clock, heartbeat_interval=datetime.timedelta(seconds=heartbeat_sec))
+
+        # Fired reminders go through a dispatch queue that rate-limits and merges
+        # notification windows; the queue is filled on the engine thread and
+        # dispatched on the GUI thread
+        self.queue_config = config_static.get("notification_queue", {})
+        self.notification_queue = NotificationQueue(self._display_notifications,
+                                                    self.queue_config.get("burst_policy", MERGE),
+                                                    self.queue_config.get("min_interval_sec", 1.0),
+                                                    self.queue_config.get("max_batch", 8),
+                                                    on_ready=self.notifications_ready.emit)
+        self.dispatch_timer = QtCore.QTimer()
+        self.dispatch_timer.setSingleShot(True)
+        self.dispatch_timer.timeout.connect(self._dispatch_notifications)
+        self.notifications_ready.connect(self._dispatch_notifications)
+        self.notification_window = None
+        self.fullscreen_windows = []
+        self.engine.subscribe(self.notification_queue.push)
+
         self.notify_list_dialog = None
+        # The add/edit and settings dialogs are built once and reset on every open
+        self.dialogs_config = config_static.get("dialogs", {})
+        self.add_dialog = None
+        self.settings_dialog = None
+        self.dialog_open_latency = {}  # last open-to-visible time per dialog, ms
         self.setup_tray_menu()
 
         self.check_overdue_reminders()
 
-        # Main reminder check timer
-        self.timer = QtCore.QTimer()
-        self.timer.timeout.connect(self.check_reminders)
-        self.timer.start(config_dynamic["settings_dialog"]["reminder_check_interval_sec"] * 1000)
+        # The engine sleeps until the earliest scheduled reminder; reminder_check_interval_sec
+        # caps the sleep as a safety net (clock changes, suspend)
+        self.engine.start()
+
+        # Pick up edits made to the data files outside the app
+        self.watch_timer = QtCore.QTimer()
+        self.watch_timer.timeout.connect(self.data_manager.check_external_changes)
+        self.watch_timer.start(int(config_static.get("storage", {}).get("watch_interval_sec", 2) * 1000))
 
         self.setToolTip(config_static["tray"]["tray_tooltip"])
         self.activated.connect(self.handle_tray_click)
         self.show()
 
+        if self.dialogs_config.get("prewarm", True):
+            QtCore.QTimer.singleShot(0, self._prewarm_dialogs)
+
     def _on_reminders_changed(self, reminders):
-        """Callback when reminders are changed"""
+        """Callback when reminders are changed (the engine picks up changes itself)"""
         if self.notify_list_dialog and self.notify_list_dialog.isVisible():
             self.notify_list_dialog.update_reminders(reminders)
 
-    def _on_completed_changed(self, completed):
-        """Callback when completed tasks are changed"""
-        # You can add logic to update the UI if needed
-        pass
-
     def _validate_reminder(self, reminder):
-        return "id" in reminder and "text" in reminder
+        return ReminderEngine.is_valid(reminder)
 
     def _get_valid_icon(self, icon_path, default_path="icons/icon.png"):
-        if os.path.exists(icon_path):
-            return QtGui.QIcon(icon_path)
+        icon = icon_cache.get_icon(icon_path)
+        if icon is not None:
+            return icon
         print(f"Warning: Icon not found at {icon_path}, using default: {default_path}")
-        return QtGui.QIcon(default_path)
+        return icon_cache.get_icon(default_path) or QtGui.QIcon(default_path)
 
     def handle_tray_click(self, reason):
         if reason == QtWidgets.QSystemTrayIcon.ActivationReason.Trigger:
@@ -97,34 +143,29 @@ class NotifyApp(QtWidgets.QSystemTrayIcon):
         self.setContextMenu(self.menu)
 
     def check_overdue_reminders(self):
-        """Check for overdue one-time reminders on startup"""
-        now = datetime.datetime.now()
-        overdue_reminders = []
-        reminders = self.data_manager.get_reminders()
-
-        for reminder in reminders[:]:
-            if not self._validate_reminder(reminder):
-                continue
-
-            # Only check one-time reminders for overdue status
-            if reminder.get("recurrence_type") == "once":
-                time_str = reminder.get("time")
-                date_str = reminder.get("date")
-
-                if time_str and date_str:
-                    try:
-                        reminder_datetime = datetime.datetime.fromisoformat(f"{date_str}T{time_str}:00")
-                        if reminder_datetime < now:
-                            overdue_reminders.append((reminder, reminder_datetime))
-                    except ValueError:
-                        print(f"Warning: Invalid date/time for reminder {reminder['id']}, skipping.")
-
-        # Sort by overdue time (most overdue first)
-        overdue_reminders.sort(key=lambda x: x[1])
-
-        for reminder, _ in overdue_reminders:
+        """Catch up on reminders missed while the app was not running, shown in one window"""
+        missed = self.engine.catch_up(self.clock.now())
+        if not missed:
+            return
+        if len(missed) == 1 and missed[0].count == 1:
+            reminder = missed[0].reminder
             self.show_fullscreen_reminder(reminder["text"], reminder.get("icon"))
-            self.mark_reminder_completed(reminder, overdue=True)
+        else:
+            self.show_fullscreen_reminder(self._format_missed(missed), None)
+
+    def _format_missed(self, missed):
+        """Text of the aggregated missed reminders window"""
+        fr_config = self.config_static.get("fullscreen_reminder", {})
+        max_lines = fr_config.get("missed_max_lines", 8)
+        lines = [fr_config.get("missed_title", "Missed reminders:")]
+        for item in missed[:max_lines]:
+            line = item.reminder["text"]
+            if item.count > 1:
+                line += " " + fr_config.get("missed_count", "(x{count})").format(count=item.count)
+            lines.append(f"{line} - {item.last.strftime('%Y-%m-%d %H:%M')}")
+        if len(missed) > max_lines:
+            lines.append(fr_config.get("missed_more", "and {count} more").format(count=len(missed) - max_lines))
+        return "\n".join(lines)
 
     def show_reminder_list(self):
         reminders = self.data_manager.get_reminders()
@@ -139,7 +180,8 @@ class NotifyApp(QtWidgets.QSystemTrayIcon):
                 self.config_dynamic, 
                 self.show_add_reminder_dialog, 
                 self.main_window,
-                self.data_manager  # Передаем data_manager
+                self.data_manager,  # Передаем data_manager
+                clock=self.clock
             )
             self.notify_list_dialog.setWindowIcon(self._get_valid_icon(self.config_static["paths"]["tray_icon"]))
         else:
@@ -148,41 +190,84 @@ class NotifyApp(QtWidgets.QSystemTrayIcon):
         self.notify_list_dialog.raise_()
         self.notify_list_dialog.activateWindow()
 
+    def _prewarm_dialogs(self):
+        """Build the dialogs while the app is idle so the first open is as fast as the next ones"""
+        self._get_add_dialog()
+        self._get_settings_dialog()
+
+    def _get_add_dialog(self, reminder_data=None):
+        if self.add_dialog is None:
+            backlog = self.data_manager.get_backlog()
+            self.add_dialog = AddNotifyDialog(backlog, self.config_static, self.config_dynamic, self.main_window,
+                                              reminder_data, self.data_manager)
+            self.add_dialog.setWindowIcon(self._get_valid_icon(self.config_static["paths"]["tray_icon"]))
+        else:
+            self.add_dialog.reset(reminder_data)
+        return self.add_dialog
+
+    def _get_settings_dialog(self):
+        if self.settings_dialog is None:
+            self.settings_dialog = SettingsDialog(self.config_static, self.config_dynamic, self.main_window,
+                                                  self.toggle_auto_run, data_manager=self.data_manager)
+            self.settings_dialog.setWindowIcon(self._get_valid_icon(self.config_static["paths"]["tray_icon"]))
+        else:
+            self.settings_dialog.reset(self.config_dynamic)
+        return self.settings_dialog
+
+    def _exec_dialog(self, name, dialog, started):
+        """exec() a dialog, recording the time from the open request until its event loop runs"""
+        QtCore.QTimer.singleShot(0, lambda: self._record_open_latency(name, started))
+        return dialog.exec()
+
+    def _record_open_latency(self, name, started):
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.dialog_open_latency[name] = latency_ms
+        if self.dialogs_config.get("log_open_latency", False):
+            print(f"{name} dialog opened in {latency_ms:.1f} ms")
+
     def show_add_reminder_dialog(self, reminder_data=None):
-        backlog = self.data_manager.get_backlog()
-        dialog = AddNotifyDialog(backlog, self.config_static, self.config_dynamic, self.main_window, reminder_data, self.data_manager)
-        dialog.setWindowIcon(self._get_valid_icon(self.config_static["paths"]["tray_icon"]))
-        if dialog.exec() == QtWidgets.QDialog.DialogCode.Accepted:
+        if self.add_dialog is not None and self.add_dialog.isVisible():
+            # Already open (e.g. from the tray menu while editing), keep the user's input
+            self.add_dialog.raise_()
+            self.add_dialog.activateWindow()
+            return
+        started = time.perf_counter()
+        dialog = self._get_add_dialog(reminder_data)
+        if self._exec_dialog("add_notify", dialog, started) == QtWidgets.QDialog.DialogCode.Accepted:
             reminder = dialog.get_notify_data()
             if reminder["text"] and self._validate_reminder(reminder):
-                if reminder_data:
-                    # Update existing reminder (preserve completed entries)
-                    old_time = reminder_data.get("time")
-                    new_time = reminder.get("time")
+                if reminder.get("icon"):
+                    # The icon file may have been added or replaced since it was last looked up
+                    icon_cache.get_cache().invalidate(reminder["icon"])
+                with self.data_manager.transaction():
+                    if reminder_data:
+                        # Update existing reminder (preserve completed entries)
+                        old_time = reminder_data.get("time")
+                        new_time = reminder.get("time")
                     
-                    # If time changed to a later time, remove from completed_today to allow re-triggering
-                    if old_time != new_time and old_time and new_time:
-                        try:
-                            old_hour, old_minute = map(int, old_time.split(":"))
-                            new_hour, new_minute = map(int, new_time.split(":"))
+                        # If time changed to a later time, remove from completed_today to allow re-triggering
+                        if old_time != new_time and old_time and new_time:
+                            try:
+                                old_hour, old_minute = map(int, old_time.split(":"))
+                                new_hour, new_minute = map(int, new_time.split(":"))
                             
-                            # Convert to minutes for easy comparison
-                            old_minutes = old_hour * 60 + old_minute
-                            new_minutes = new_hour * 60 + new_minute
+                                # Convert to minutes for easy comparison
+                                old_minutes = old_hour * 60 + old_minute
+                                new_minutes = new_hour * 60 + new_minute
                             
-                            # Only reset if new time is later than old time
-                            if new_minutes > old_minutes:
-                                self.data_manager.remove_completed_entry(reminder_data["id"])
-                        except ValueError:
-                            # If time format is invalid, don't reset
-                            pass
+                                # Only reset if new time is later than old time
+                                if new_minutes > old_minutes:
+                                    self.data_manager.remove_completed_entry(reminder_data["id"])
+                            except ValueError:
+                                # If time format is invalid, don't reset
+                                pass
                     
-                    self.data_manager.update_reminder(reminder_data["id"], reminder)
-                else:
-                    # Add new reminder
-                    self.data_manager.add_reminder(reminder)
-                    # Add to backlog when creating new notification (not when editing)
-                    self.data_manager.add_to_backlog(reminder["text"])
+                        self.data_manager.update_reminder(reminder_data["id"], reminder)
+                    else:
+                        # Add new reminder
+                        self.data_manager.add_reminder(reminder)
+                        # Add to backlog when creating new notification (not when editing)
+                        self.data_manager.add_to_backlog(reminder["text"])
                 
                 if self.notify_list_dialog and self.notify_list_dialog.isVisible():
                     # UI will update automatically via callback
@@ -194,16 +279,22 @@ class NotifyApp(QtWidgets.QSystemTrayIcon):
         self.show_add_reminder_dialog(reminder)
 
     def show_settings_dialog(self):
-        dialog = SettingsDialog(self.config_static, self.config_dynamic, self.main_window, self.toggle_auto_run)
-        dialog.setWindowIcon(self._get_valid_icon(self.config_static["paths"]["tray_icon"]))
-        if dialog.exec() == QtWidgets.QDialog.DialogCode.Accepted:
+        if self.settings_dialog is not None and self.settings_dialog.isVisible():
+            self.settings_dialog.raise_()
+            self.settings_dialog.activateWindow()
+            return
+        started = time.perf_counter()
+        dialog = self._get_settings_dialog()
+        if self._exec_dialog("settings", dialog, started) == QtWidgets.QDialog.DialogCode.Accepted:
             self.config_dynamic = dialog.get_config_data()
             self.data_manager.update_config_dynamic(self.config_dynamic)
-            self.timer.setInterval(self.config_dynamic["settings_dialog"]["reminder_check_interval_sec"] * 1000)
+            self.check_interval_ms = self.config_dynamic["settings_dialog"]["reminder_check_interval_sec"] * 1000
+            self.engine.check_interval = datetime.timedelta(milliseconds=self.check_interval_ms)
             self.setIcon(self._get_valid_icon(self.config_static["paths"]["tray_icon"]))
             self.setToolTip(self.config_static["tray"]["tray_tooltip"])
 
     def toggle_auto_run(self, enabled):
+        import winreg  # Windows only, keeps the module importable elsewhere
         key = winreg.HKEY_CURRENT_USER
         key_path = r"Software\Microsoft\Windows\CurrentVersion\Run"
         script_path = os.path.abspath(sys.argv[0])
@@ -227,10 +318,11 @@ class NotifyApp(QtWidgets.QSystemTrayIcon):
         reminder_text = reminder["text"]
 
         # Always remove the reminder when delete button is clicked
-        # 1. Add to backlog for history
-        self.data_manager.add_to_backlog(reminder_text)
-        # 2. Remove from notifications
-        self.data_manager.remove_reminder(reminder_id)
+        with self.data_manager.transaction():
+            # 1. Add to backlog for history
+            self.data_manager.add_to_backlog(reminder_text)
+            # 2. Remove from notifications
+            self.data_manager.remove_reminder(reminder_id)
 
         if self.notify_list_dialog and self.notify_list_dialog.isVisible():
             # UI will update automatically via callback
@@ -238,72 +330,55 @@ class NotifyApp(QtWidgets.QSystemTrayIcon):
         else:
             self.show_reminder_list()
 
-    def mark_reminder_completed(self, reminder, overdue=False):
-        """Mark a reminder as completed and handle file updates"""
-        if not self._validate_reminder(reminder):
-            return
-
-        reminder_id = reminder["id"]
-        reminder_text = reminder["text"]
-        recurrence_type = reminder.get("recurrence_type")
-
-        if recurrence_type == "once":
-            # For one-time reminders:
-            # 1. Add to backlog
-            self.data_manager.add_to_backlog(reminder_text)
-            # 2. Remove from notifications
-            self.data_manager.remove_reminder(reminder_id)
-        else:
-            # For recurring reminders, just mark as completed today
-            self.data_manager.add_completed_entry(reminder_id)
-
     def check_reminders(self):
-        """Main reminder checking logic - called periodically"""
-        now = datetime.datetime.now()
-        reminders = self.data_manager.get_reminders()
-        completed = self.data_manager.get_completed()
-        completed_records = {c["id"] for c in completed}
-
-        for reminder in reminders[:]:
-            if not self._validate_reminder(reminder):
-                continue
-
-            should_show = self.should_show_reminder(reminder, now, completed_records, completed)
-            if should_show:
-                self.show_fullscreen_reminder(reminder["text"], reminder.get("icon"))
-                self.mark_reminder_completed(reminder)
-
-    def should_show_reminder(self, reminder, now, completed_records, completed=None):
-        """Check if a reminder should be shown at the given time, передаёт дату последнего показа в методы проверок"""
-        reminder_id = reminder.get("id")
-        recurrence_type = reminder.get("recurrence_type")
-        last_completed_at = None
-        if completed is not None:
-            for entry in completed:
-                if entry.get("id") == reminder_id:
-                    last_completed_at = entry.get("completed_at")
-                    break
-        if recurrence_type == "once":
-            return ReminderChecker.one_time(reminder, now)
-        elif recurrence_type == "daily":
-            return ReminderChecker.daily(reminder, now, last_completed_at)
-        elif recurrence_type == "weekly":
-            return ReminderChecker.weekly(reminder, now, last_completed_at)
-        elif recurrence_type == "monthly":
-            return ReminderChecker.monthly(reminder, now, last_completed_at)
-        elif recurrence_type == "yearly":
-            return ReminderChecker.yearly(reminder, now, last_completed_at)
-        else:
-            return True
+        """Ask the engine to check for due reminders right away"""
+        self.engine.wake()
+
+    def _dispatch_notifications(self):
+        """Show queued notifications, re-armed while the rate limit holds some back"""
+        delay = self.notification_queue.dispatch()
+        if delay is not None:
+            self.dispatch_timer.start(int(delay * 1000))
+
+    def _display_notifications(self, batch):
+        """Show a batch from the dispatch queue: merged into the open window or in a new one"""
+        window = self.notification_window
+        if window is None or self.notification_queue.policy == SERIAL:
+            first, batch = batch[0].reminder, batch[1:]
+            window = self.show_fullscreen_reminder(first["text"], first.get("icon"))
+            window.closed.connect(lambda w=window: self._on_notification_closed(w))
+            self.notification_window = window
+        for item in batch:
+            window.add_item(item.reminder["text"], item.reminder.get("icon"))
+
+    def _on_notification_closed(self, window):
+        if window is self.notification_window:
+            self.notification_window = None
+            self.notification_queue.window_closed()
+            self._dispatch_notifications()
 
     def show_fullscreen_reminder(self, text, icon_path):
         reminder = FullscreenReminder(text, icon_path, self.config_static)
         reminder.setWindowIcon(self._get_valid_icon(self.config_static["paths"]["tray_icon"]))
+        # Keep a reference until the window is closed
+        self.fullscreen_windows.append(reminder)
+        reminder.closed.connect(lambda w=reminder: self._forget_window(w))
         reminder.show()
+        return reminder
+
+    def _forget_window(self, window):
+        if window in self.fullscreen_windows:
+            self.fullscreen_windows.remove(window)
+
+    def shutdown(self):
+        """Stop firing reminders, then save all changes and fold the journal"""
+        if self.engine.running and self.queue_config.get("log_metrics", False):
+            print(f"Notification queue: {self.notification_queue.metrics()}")
+        self.engine.stop()
+        self.data_manager.close()
 
     def exit_app(self):
-        # Force save all changes before exit
-        self.data_manager.force_save_all()
+        self.shutdown()
         
         self.hide()
         self.app.quit()
@@ -321,11 +396,15 @@ if __name__ == "__main__":
 
     # Safely get tray icon path with fallback
     tray_icon_path = config_static.get("paths", {}).get("tray_icon", "icons/icon.png")
-    app.setWindowIcon(QtGui.QIcon(tray_icon_path))
+    icon_cache.configure(config_static)
+    app_icon = icon_cache.get_icon(tray_icon_path) or QtGui.QIcon(tray_icon_path)
+    app.setWindowIcon(app_icon)
 
     main_window = QtWidgets.QMainWindow()
-    main_window.setWindowIcon(QtGui.QIcon(tray_icon_path))
+    main_window.setWindowIcon(app_icon)
     main_window.hide()
 
     tray = NotifyApp(app, config_static, config_dynamic, main_window)
+    # Flush queued writes on any shutdown path (session end, quit from elsewhere)
+    app.aboutToQuit.connect(tray.shutdown)
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""
+Time to stream the merged agenda (agenda.iter_agenda) of a synthetic mix of
+all recurrence types over windows of increasing length:
+
+    python bench/agenda_stream.py --reminders 10000 --days 30 365
+"""
+import argparse
+import datetime
+from timing import best_of
+from agenda import iter_agenda
+from reminder_check import CompiledReminder
+from simulate import synthetic_reminders
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time iter_agenda over growing windows")
+    parser.add_argument("--reminders", type=int, default=10000, help="number of reminders")
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 365], help="window lengths")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the best is reported")
+    args = parser.parse_args()
+
+    start = datetime.datetime(2026, 1, 1)
+    reminders = [CompiledReminder(reminder) for reminder in synthetic_reminders(args.reminders, start)]
+    print(f"{args.reminders} reminders")
+    for days in args.days:
+        end = start + datetime.timedelta(days=days)
+        elapsed, count = best_of(lambda: sum(1 for _ in iter_agenda(reminders, start, end)), args.repeat)
+        print(f"  {days:5} days {count:9} occurrences {elapsed:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Cost of one due check of every reminder depending on how its last completion
+is found, against a DataManager with in-memory storage:
+
+    scan      walk the completed list per reminder (how app.pyw used to do it)
+    index     DataManager.get_last_completed() + ReminderChecker.is_due()
+    compiled  ReminderEngine.should_fire(): the cached CompiledReminder
+
+    python bench/completed_lookup.py --reminders 50000 --completed 25000
+
+The scan is quadratic, so it is timed on --scan-sample reminders and
+extrapolated to the whole set.
+"""
+import argparse
+import datetime
+from timing import best_of
+from data_manager import DataManager
+from reminder_check import ReminderChecker
+from scheduler import ReminderEngine
+from simulate import SIMULATION_CONFIG
+
+
+def scan_last_completed(completed, reminder_id):
+    """Last completion of a reminder found by walking the completed list"""
+    for entry in completed:
+        if entry.get("id") == reminder_id:
+            return entry.get("completed_at")
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare last-completion lookups of a full due check")
+    parser.add_argument("--reminders", type=int, default=50000, help="number of daily reminders")
+    parser.add_argument("--completed", type=int, default=25000, help="how many of them have a completion")
+    parser.add_argument("--scan-sample", type=int, default=500, help="reminders timed with the linear scan")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the best is reported")
+    args = parser.parse_args()
+
+    now = datetime.datetime(2026, 1, 15, 12, 0)
+    # Every other completion is from today, so those reminders are not due
+    moments = [(now - datetime.timedelta(days=1)).isoformat(), now.replace(hour=9, minute=30).isoformat()]
+    reminders = [{"id": f"bench-{i}", "text": f"Reminder {i}", "time": "09:00",
+                  "recurrence_type": "daily", "recurring": True} for i in range(args.reminders)]
+    # Completions in reverse order, so the scan does not find early reminders first
+    completed = [{"id": f"bench-{i}", "completed_at": moments[i % 2]} for i in reversed(range(args.completed))]
+
+    data_manager = DataManager(SIMULATION_CONFIG)
+    data_manager.update_reminders(reminders)
+    data_manager.update_completed(completed)
+    engine = ReminderEngine(data_manager)
+    reminders = data_manager.get_reminders()
+
+    def scan():
+        entries = data_manager.get_completed()
+        return [ReminderChecker.is_due(reminder, now, scan_last_completed(entries, reminder["id"]))
+                for reminder in reminders[:args.scan_sample]]
+
+    def index():
+        return [ReminderChecker.is_due(reminder, now, data_manager.get_last_completed(reminder["id"]))
+                for reminder in reminders]
+
+    def compiled():
+        return [engine.should_fire(reminder, now) for reminder in reminders]
+
+    scan_ms, scan_due = best_of(scan, 1)
+    index_ms, index_due = best_of(index, args.repeat)
+    compiled_ms, compiled_due = best_of(compiled, args.repeat)
+    if index_due != compiled_due or scan_due != index_due[:args.scan_sample]:
+        raise AssertionError("the lookups disagree on which reminders are due")
+
+    sample = min(args.scan_sample, len(reminders))
+    print(f"{len(reminders)} daily reminders, {len(completed)} completions, {sum(index_due)} due")
+    print(f"  scan      {scan_ms * len(reminders) / max(sample, 1):10.1f} ms (extrapolated from {sample})")
+    print(f"  index     {index_ms:10.1f} ms")
+    print(f"  compiled  {compiled_ms:10.1f} ms")
+    data_manager.close()
+
+
+if __name__ == "__main__":
+    main()
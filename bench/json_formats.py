@@ -0,0 +1,43 @@
+"""
+Size, save and load time of the save_json formats (pretty, compact, jsonl)
+for a synthetic reminder list, through utils.save_json/load_json:
+
+    python bench/json_formats.py --reminders 10000 100000
+"""
+import argparse
+import datetime
+import os
+import tempfile
+from timing import best_of
+from simulate import synthetic_reminders
+from utils import JSON_FORMATS, load_json, save_json
+
+
+def run(count, repeat):
+    reminders = synthetic_reminders(count, datetime.datetime(2026, 1, 1))
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in JSON_FORMATS:
+            path = os.path.join(directory, f"notify-{fmt}.json")
+            write_ms, _ = best_of(lambda: save_json(path, reminders, fmt), repeat)
+            load_ms, loaded = best_of(lambda: load_json(path), repeat)
+            if loaded != reminders:
+                raise AssertionError(f"{fmt}: loaded data differs from the saved data")
+            rows.append((fmt, os.path.getsize(path), write_ms, load_ms))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the JSON storage formats")
+    parser.add_argument("--reminders", type=int, nargs="+", default=[10000, 100000], help="list sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the best is reported")
+    args = parser.parse_args()
+
+    for count in args.reminders:
+        print(f"{count} reminders")
+        for fmt, size, write_ms, load_ms in run(count, args.repeat):
+            print(f"  {fmt:8} {size / 1e6:7.2f} MB   save {write_ms:7.1f} ms   load {load_ms:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Cost of single-record mutations (update_reminder + add_completed_entry) as
+the reminder set grows, with and without change subscribers attached, on a
+DataManager writing to a temporary directory:
+
+    python bench/mutation_cost.py --reminders 100 10000 100000 --backend journal
+
+"wake" subscribers ignore the notification like ReminderEngine.wake; the
+"reader" subscriber reads the reminder list like the open list dialog, so it
+pays for building the snapshot.
+"""
+import argparse
+import os
+import tempfile
+from timing import best_of
+from data_manager import DataManager
+from storage import STORAGE_BACKENDS
+
+
+def make_config(directory, backend, write_behind):
+    return {
+        "paths": {name: os.path.join(directory, f"{name}.json") for name in ("notify_path", "backlog_path",
+                                                                             "completed_path")},
+        "storage": {"backend": backend, "write_behind": write_behind, "json_format": "compact",
+                    "sqlite_path": os.path.join(directory, "notify.db")},
+        "history": {"enabled": False},
+    }
+
+
+def run(count, backend, write_behind, subscribers, operations, repeat):
+    with tempfile.TemporaryDirectory() as directory:
+        data_manager = DataManager(make_config(directory, backend, write_behind))
+        data_manager.update_reminders([{"id": f"bench-{i}", "text": f"Reminder {i}", "time": "09:00",
+                                        "recurrence_type": "daily", "recurring": True} for i in range(count)])
+        data_manager.flush()
+        if subscribers in ("wake", "reader"):
+            for data_type in ("reminders", "completed"):
+                data_manager.subscribe(data_type, lambda *_: None)
+        if subscribers == "reader":
+            data_manager.subscribe("reminders", lambda reminders: len(reminders))
+
+        step = max(1, count // operations)
+        ids = [f"bench-{i}" for i in range(0, count, step)][:operations]
+
+        def mutate():
+            for n, reminder_id in enumerate(ids):
+                data_manager.update_reminder(reminder_id, {"id": reminder_id, "text": f"Edited {n}",
+                                                           "time": "10:00", "recurrence_type": "daily",
+                                                           "recurring": True})
+                data_manager.add_completed_entry(reminder_id)
+
+        elapsed_ms, _ = best_of(mutate, repeat)
+        data_manager.close()
+    return elapsed_ms * 1000 / len(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time single-record mutations as the data set grows")
+    parser.add_argument("--reminders", type=int, nargs="+", default=[100, 10000, 100000], help="data set sizes")
+    parser.add_argument("--backend", choices=sorted(STORAGE_BACKENDS), default="journal", help="storage backend")
+    parser.add_argument("--sync", action="store_true", help="write synchronously instead of write-behind")
+    parser.add_argument("--operations", type=int, default=200, help="mutations timed per run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the best is reported")
+    args = parser.parse_args()
+
+    print(f"{args.backend} backend, {'synchronous writes' if args.sync else 'write-behind'}, "
+          f"us per update_reminder + add_completed_entry")
+    print(f"  {'reminders':>10} {'none':>10} {'wake':>10} {'reader':>10}")
+    for count in args.reminders:
+        costs = [run(count, args.backend, not args.sync, subscribers, args.operations, args.repeat)
+                 for subscribers in ("none", "wake", "reader")]
+        print(f"  {count:10} " + " ".join(f"{cost:10.1f}" for cost in costs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Reminder list cost with real Qt widgets (offscreen): building the sorted
+model, with and without the deadlines the scheduler already computed, an
+unchanged refresh, and painting rows with ReminderItemDelegate.
+
+    python bench/reminder_list.py --reminders 1000 10000 100000
+
+Needs PyQt6. In the dialog only the visible rows are painted; painting the
+first --paint-rows rows here gives a per-row cost.
+"""
+import argparse
+import datetime
+import os
+import sys
+from timing import best_of
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+try:
+    from PyQt6 import QtCore, QtGui, QtWidgets
+except ImportError:
+    sys.exit("PyQt6 is not installed, this benchmark needs the real Qt widgets")
+
+from reminder_check import CompiledReminder
+from reminder_list_view import ReminderItemDelegate, ReminderListModel
+from scheduler import ReminderScheduler
+from simulate import synthetic_reminders
+from utils import load_json
+
+CONFIG_STATIC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config_static.json")
+
+
+def compile_all(reminders):
+    return [CompiledReminder(reminder) for reminder in reminders]
+
+
+def paint_rows(delegate, model, width, rows):
+    image = QtGui.QImage(width, delegate.ROW_HEIGHT, QtGui.QImage.Format.Format_ARGB32_Premultiplied)
+    painter = QtGui.QPainter(image)
+    option = QtWidgets.QStyleOptionViewItem()
+    option.rect = QtCore.QRect(0, 0, width, delegate.ROW_HEIGHT)
+    for row in range(rows):
+        delegate.paint(painter, option, model.index(row))
+    painter.end()
+
+
+def run(config_static, count, now, repeat, width, paint_limit):
+    reminders = synthetic_reminders(count, now - datetime.timedelta(days=30))
+    results = {}
+
+    # Fresh compiled records: every next fire time is computed by the list
+    results["build, cold"], _ = best_of(
+        lambda: ReminderListModel(config_static).set_reminders(compile_all(reminders), now), repeat)
+    results["compile only"], _ = best_of(lambda: compile_all(reminders), repeat)
+
+    # As in the app: the scheduler synced the same compiled records first
+    compiled = compile_all(reminders)
+    ReminderScheduler().sync(compiled, now)
+    model = ReminderListModel(config_static)
+    results["build, after scheduler sync"], _ = best_of(lambda: model.set_reminders(compiled, now), repeat)
+    later = now + datetime.timedelta(minutes=1)
+    results["refresh, nothing changed"], _ = best_of(lambda: model.update_reminders(compiled, later), repeat)
+
+    delegate = ReminderItemDelegate(config_static)
+    painted = min(model.rowCount(), paint_limit)
+    results[f"paint {painted} rows"], _ = best_of(lambda: paint_rows(delegate, model, width, painted), repeat)
+    return model.rowCount(), painted, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the reminder list model and delegate")
+    parser.add_argument("--reminders", type=int, nargs="+", default=[1000, 10000, 100000], help="list sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the best is reported")
+    parser.add_argument("--width", type=int, default=600, help="row width in pixels")
+    parser.add_argument("--paint-rows", type=int, default=5000, help="how many rows to paint")
+    args = parser.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv[:1])
+    config_static = load_json(CONFIG_STATIC_PATH, {})
+    now = datetime.datetime.now().replace(second=0, microsecond=0)
+    for count in args.reminders:
+        rows, painted, results = run(config_static, count, now, args.repeat, args.width, args.paint_rows)
+        print(f"{count} reminders, {rows} rows")
+        for name, elapsed in results.items():
+            print(f"  {name:28} {elapsed:9.1f} ms")
+        print(f"  {'paint per row':28} {results[f'paint {painted} rows'] * 1000 / max(painted, 1):9.1f} us")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Write-path latency of utils.save_json for a synthetic reminder list:
+
+    first     no previous file, so nothing is rotated to the backup
+    rotate    previous version saved by this process: hard-linked as the backup
+    verify    previous version of unknown state (changed on disk since this
+              process last read or wrote it): parsed before it becomes the backup
+
+    python bench/save_json.py --reminders 10000 100000 --format pretty
+"""
+import argparse
+import datetime
+import os
+import tempfile
+from timing import best_of
+import utils
+from simulate import synthetic_reminders
+
+
+def run(count, fmt, repeat):
+    reminders = synthetic_reminders(count, datetime.datetime(2026, 1, 1))
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "notify.json")
+
+        def first():
+            for name in (path, utils.backup_path(path)):
+                if os.path.exists(name):
+                    os.remove(name)
+            utils.save_json(path, reminders, fmt)
+
+        def verify():
+            utils._known_good.clear()
+            utils.save_json(path, reminders, fmt)
+
+        results["first"], _ = best_of(first, repeat)
+        results["rotate"], _ = best_of(lambda: utils.save_json(path, reminders, fmt), repeat)
+        results["verify"], _ = best_of(verify, repeat)
+        size = os.path.getsize(path)
+    return size, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time save_json with and without backup rotation")
+    parser.add_argument("--reminders", type=int, nargs="+", default=[10000, 100000], help="list sizes")
+    parser.add_argument("--format", choices=utils.JSON_FORMATS, default="pretty", help="file format")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the best is reported")
+    args = parser.parse_args()
+
+    for count in args.reminders:
+        size, results = run(count, args.format, args.repeat)
+        print(f"{count} reminders, {args.format}, {size / 1e6:.2f} MB")
+        for name, elapsed in results.items():
+            print(f"  {name:8} {elapsed:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import os
+import sys
+import time
+
+# Benchmarks run as `python bench/<script>.py` and import the application modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def best_of(function, repeat=3):
+    """Shortest wall time of repeat calls, in milliseconds, and the last result"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
@@ -0,0 +1,155 @@
+import calendar
+from typing import Any, Iterable, List
+from reminder_check import CompiledReminder
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure-Python pass gives the same results
+    np = None
+
+# Recurrence codes of the columnar layout
+ONCE, DAILY, WEEKLY, MONTHLY, YEARLY, ALWAYS, FALLBACK = range(7)
+RECURRENCE_CODES = {"once": ONCE, "daily": DAILY, "weekly": WEEKLY, "monthly": MONTHLY, "yearly": YEARLY}
+
+NEVER = 2 ** 62  # Sentinel for "no due minute" / "no fire moment"
+NO_COMPLETION = -1
+MICROSECONDS_PER_DAY = 86_400_000_000
+INT32_RANGE = range(-2 ** 31, 2 ** 31)
+
+
+def _moment_key(moment) -> int:
+    """Naive datetime as microseconds since 0001-01-01, comparable as an integer"""
+    seconds = moment.hour * 3600 + moment.minute * 60 + moment.second
+    return moment.toordinal() * MICROSECONDS_PER_DAY + seconds * 1_000_000 + moment.microsecond
+
+
+def _day_column(value: Any) -> bool:
+    """Whether a day/month field can be evaluated in an integer column"""
+    return isinstance(value, int) and value in INT32_RANGE
+
+
+class BulkReminderChecker:
+    """
+    Batch due evaluation for large reminder sets.
+
+    Schedules are laid out in columns (recurrence code, due minute, fire moment,
+    weekday mask, month/day, last completion day/month/year) and the "due now"
+    mask of all reminders is computed in one pass, vectorized with NumPy when it
+    is installed. Results are the same as CompiledReminder.is_due (and so
+    ReminderChecker.is_due); rows the columns cannot express are evaluated
+    one by one.
+    """
+
+    def __init__(self, compiled_reminders: Iterable[CompiledReminder], use_numpy: bool = True):
+        self.reminders = tuple(compiled_reminders)
+        self.ids = [compiled.id for compiled in self.reminders]
+        self.use_numpy = use_numpy and np is not None
+
+        columns = {name: [] for name in ("code", "due_minute", "fire_key", "weekday_mask", "day", "month",
+                                         "completed_ordinal", "completed_month", "completed_year", "completed_invalid")}
+        self._fallback_rows: List[int] = []
+        for row, compiled in enumerate(self.reminders):
+            code = RECURRENCE_CODES.get(compiled.recurrence_type, ALWAYS)
+            day, month = 1, 1
+            if code == MONTHLY:
+                day = compiled.monthly_day
+            elif code == YEARLY:
+                day, month = compiled.yearly_day, compiled.yearly_month
+            if not (_day_column(day) and _day_column(month)):
+                code, day, month = FALLBACK, 1, 1
+                self._fallback_rows.append(row)
+            columns["code"].append(code)
+            columns["due_minute"].append(NEVER if compiled.due_minute is None else compiled.due_minute)
+            columns["fire_key"].append(NEVER if compiled.fire_at is None else _moment_key(compiled.fire_at))
+            columns["weekday_mask"].append(compiled.weekday_mask)
+            columns["day"].append(day)
+            columns["month"].append(month)
+            columns["completed_ordinal"].append(NO_COMPLETION if compiled.completed_ordinal is None else compiled.completed_ordinal)
+            columns["completed_month"].append(NO_COMPLETION if compiled.completed_month is None else compiled.completed_month)
+            columns["completed_year"].append(NO_COMPLETION if compiled.completed_year is None else compiled.completed_year)
+            columns["completed_invalid"].append(compiled.completed_invalid)
+
+        if self.use_numpy:
+            self.columns = {name: np.array(values, dtype=bool if name == "completed_invalid" else np.int64)
+                            for name, values in columns.items()}
+        else:
+            self.columns = columns
+
+    def __len__(self):
+        return len(self.reminders)
+
+    def due_mask(self, now):
+        """Due flag of every reminder at now, in reminder order (a NumPy bool array when vectorized)"""
+        if self.use_numpy:
+            mask = self._due_numpy(now)
+        else:
+            mask = self._due_python(now)
+        for row in self._fallback_rows:
+            try:
+                mask[row] = self.reminders[row].is_due(now)
+            except Exception:
+                # Malformed day/month values make the predicates raise, such a reminder never fires
+                mask[row] = False
+        return mask
+
+    def due_ids(self, now) -> List[Any]:
+        """Ids of reminders due at now, in reminder order"""
+        mask = self.due_mask(now)
+        if self.use_numpy:
+            return [self.ids[row] for row in np.flatnonzero(mask)]
+        return [reminder_id for reminder_id, due in zip(self.ids, mask) if due]
+
+    def _due_numpy(self, now):
+        c = self.columns
+        code = c["code"]
+        today = now.toordinal()
+        days_in_month = calendar.monthrange(now.year, now.month)[1]
+        time_ok = c["due_minute"] <= now.hour * 60 + now.minute
+        valid = ~c["completed_invalid"]
+        not_today = c["completed_ordinal"] != today
+        reached_day = now.day >= np.minimum(c["day"], days_in_month)
+
+        mask = code == ALWAYS
+        mask |= (code == ONCE) & (c["fire_key"] <= _moment_key(now))
+        mask |= (code == DAILY) & time_ok & valid & not_today
+        mask |= ((code == WEEKLY) & time_ok & not_today
+                 & ((c["weekday_mask"] >> now.weekday()) & 1).astype(bool))
+        mask |= ((code == MONTHLY) & time_ok & valid & reached_day
+                 & (c["completed_month"] != now.year * 12 + now.month))
+        mask |= ((code == YEARLY) & time_ok & valid & reached_day
+                 & (c["completed_year"] != now.year) & (c["month"] == now.month))
+        return mask
+
+    def _due_python(self, now) -> List[bool]:
+        c = self.columns
+        today = now.toordinal()
+        now_minute = now.hour * 60 + now.minute
+        now_key = _moment_key(now)
+        weekday = now.weekday()
+        month_key = now.year * 12 + now.month
+        days_in_month = calendar.monthrange(now.year, now.month)[1]
+
+        mask = []
+        for code, due_minute, fire_key, weekday_mask, day, month, completed_ordinal, completed_month, \
+                completed_year, completed_invalid in zip(c["code"], c["due_minute"], c["fire_key"],
+                                                         c["weekday_mask"], c["day"], c["month"],
+                                                         c["completed_ordinal"], c["completed_month"],
+                                                         c["completed_year"], c["completed_invalid"]):
+            if code == ALWAYS:
+                due = True
+            elif code == ONCE:
+                due = fire_key <= now_key
+            elif code == FALLBACK or due_minute > now_minute:
+                due = False
+            elif code == DAILY:
+                due = not completed_invalid and completed_ordinal != today
+            elif code == WEEKLY:
+                due = bool(weekday_mask >> weekday & 1) and completed_ordinal != today
+            elif completed_invalid or now.day < min(day, days_in_month):
+                due = False
+            elif code == MONTHLY:
+                due = completed_month != month_key
+            else:
+                due = completed_year != now.year and month == now.month
+            mask.append(due)
+        return mask
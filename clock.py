@@ -0,0 +1,32 @@
+import datetime
+
+
+class SystemClock:
+    """
+    Wall clock used by the app. Everything that asks "what time is it" for
+    scheduling goes through a clock object so it can be replaced in simulations
+    """
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now()
+
+
+class FakeClock(SystemClock):
+    """
+    Manually driven clock for simulations: time only moves when told to
+    """
+
+    def __init__(self, start: datetime.datetime):
+        self._now = start
+
+    def now(self) -> datetime.datetime:
+        return self._now
+
+    def set(self, moment: datetime.datetime) -> None:
+        """Jump to a moment (never backwards)"""
+        if moment > self._now:
+            self._now = moment
+
+    def advance(self, delta: datetime.timedelta) -> None:
+        """Move the clock forward by delta"""
+        self._now += delta
@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterator, Optional
+from clock import SystemClock
+from utils import load_json, repair_torn_line, save_json
+
+# Longest gap (in days) between two completions that still continues a streak
+STREAK_ALLOWANCE_DAYS = {
+    "daily": 1,
+    "weekly": 7,
+    "monthly": 31,
+    "yearly": 366,
+}
+
+
+class CompletionHistory:
+    """
+    Append-only completion log partitioned by month (completions-YYYY-MM.jsonl)
+    with per-reminder rollups (count, last fired, streak).
+
+    Rollups are kept in memory and saved to rollups.json together with the log
+    position they cover, so after a crash the missing tail is replayed from the log.
+    Retention follows the injected clock, so it can be simulated.
+    """
+
+    PARTITION_PREFIX = "completions-"
+    PARTITION_SUFFIX = ".jsonl"
+
+    def __init__(self, directory: str, retention_months: int = 12, clock: Optional[SystemClock] = None):
+        self.directory = directory
+        self.retention_months = retention_months
+        self.clock = clock or SystemClock()
+        self._lock = threading.Lock()
+        self._rollups: Dict[str, Dict[str, Any]] = {}
+        self._position = {"partition": "", "offset": 0}
+        self._dirty = False
+        self._retention_month = ""  # Month retention was last applied in
+        os.makedirs(directory, exist_ok=True)
+        self._apply_retention()
+        # A crash during an append leaves a partial last line; the next append
+        # would continue it and be skipped with it
+        for partition in self._partitions():
+            repair_torn_line(self._partition_path(partition))
+        self._load_rollups()
+
+    def _partition_path(self, partition: str) -> str:
+        return os.path.join(self.directory, f"{self.PARTITION_PREFIX}{partition}{self.PARTITION_SUFFIX}")
+
+    def _partitions(self):
+        """Existing partitions (YYYY-MM), oldest first"""
+        names = []
+        for name in os.listdir(self.directory):
+            if name.startswith(self.PARTITION_PREFIX) and name.endswith(self.PARTITION_SUFFIX):
+                names.append(name[len(self.PARTITION_PREFIX):-len(self.PARTITION_SUFFIX)])
+        return sorted(names)
+
+    def _apply_retention(self) -> None:
+        """Delete partitions older than retention_months"""
+        if not self.retention_months:
+            return
+        now = self.clock.now()
+        self._retention_month = now.strftime("%Y-%m")
+        months = now.year * 12 + now.month - 1 - self.retention_months
+        oldest = f"{months // 12:04d}-{months % 12 + 1:02d}"
+        for partition in self._partitions():
+            if partition < oldest:
+                try:
+                    os.remove(self._partition_path(partition))
+                except OSError as e:
+                    print(f"Error removing history partition {partition}: {e}")
+
+    def _rollups_path(self) -> str:
+        return os.path.join(self.directory, "rollups.json")
+
+    def _load_rollups(self) -> None:
+        """Load saved rollups and replay log records written after them"""
+        saved = load_json(self._rollups_path(), {})
+        if isinstance(saved, dict):
+            self._rollups = saved.get("rollups", {})
+            self._position = saved.get("position", self._position)
+        for partition in self._partitions():
+            if partition < self._position["partition"]:
+                continue
+            offset = self._position["offset"] if partition == self._position["partition"] else 0
+            with open(self._partition_path(partition), 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._update_rollup(record)
+                    self._dirty = True
+                self._position = {"partition": partition, "offset": f.tell()}
+
+    def _update_rollup(self, record: Dict[str, Any]) -> None:
+        completed_at = datetime.fromisoformat(record["completed_at"])
+        rollup = self._rollups.get(record["id"])
+        if rollup is None:
+            self._rollups[record["id"]] = {"count": 1, "last_fired": record["completed_at"], "streak": 1}
+            return
+        rollup["count"] += 1
+        last_fired = datetime.fromisoformat(rollup["last_fired"])
+        if completed_at < last_fired:
+            # Recorded out of order: counts, but neither moves last_fired back nor touches the streak
+            return
+        gap = (completed_at.date() - last_fired.date()).days
+        if gap > STREAK_ALLOWANCE_DAYS.get(record.get("recurrence_type"), 1):
+            rollup["streak"] = 1
+        elif gap > 0:
+            rollup["streak"] += 1
+        rollup["last_fired"] = record["completed_at"]
+
+    def record(self, reminder_id: str, completed_at: datetime, recurrence_type: Optional[str] = None) -> None:
+        """Append a completion to the log and update the rollup"""
+        record = {"id": reminder_id, "completed_at": completed_at.isoformat(), "recurrence_type": recurrence_type}
+        partition = completed_at.strftime("%Y-%m")
+        with self._lock:
+            if self.clock.now().strftime("%Y-%m") != self._retention_month:
+                # A long-running instance drops expired partitions once a month
+                self._apply_retention()
+            with open(self._partition_path(partition), 'ab') as f:
+                f.write((json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8'))
+                offset = f.tell()
+            self._update_rollup(record)
+            if partition >= self._position["partition"]:
+                self._position = {"partition": partition, "offset": offset}
+            self._dirty = True
+
+    def get_rollup(self, reminder_id: str) -> Optional[Dict[str, Any]]:
+        """Rollup of a reminder: count, last_fired and streak"""
+        with self._lock:
+            rollup = self._rollups.get(reminder_id)
+            return dict(rollup) if rollup else None
+
+    def iter_records(self, reminder_id: Optional[str] = None, since: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        """Iterate logged completions in time order, optionally for one reminder and/or from a date"""
+        first = since.strftime("%Y-%m") if since else ""
+        for partition in self._partitions():
+            if partition < first:
+                continue
+            with open(self._partition_path(partition), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if reminder_id and record.get("id") != reminder_id:
+                        continue
+                    if since and datetime.fromisoformat(record["completed_at"]) < since:
+                        continue
+                    yield record
+
+    def forget(self, reminder_id: str) -> None:
+        """Drop the rollup of a deleted reminder (its log records age out with retention)"""
+        with self._lock:
+            if self._rollups.pop(reminder_id, None) is not None:
+                self._dirty = True
+
+    def flush(self) -> None:
+        """Save rollups if they changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            save_json(self._rollups_path(), {"position": self._position, "rollups": self._rollups}, "compact")
+            self._dirty = False
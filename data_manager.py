@@ -1,9 +1,62 @@
+import atexit
+import copy
 import json
 import os
 import threading
-from typing import Dict, List, Any, Optional, Callable
+import time
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Callable, Iterator, Mapping, NamedTuple, Sequence, Tuple
 from datetime import datetime
 from utils import load_json, save_json
+from storage import create_storage
+from file_watcher import FileWatcher
+from completion_history import CompletionHistory
+from clock import SystemClock
+from reminder_check import CompiledReminder
+from agenda import Occurrence, iter_agenda
+
+class Snapshot(NamedTuple):
+    """Immutable view of one data type at a given version"""
+    version: int
+    items: Tuple[Mapping[str, Any], ...]
+
+
+class LazySnapshot(Sequence):
+    """
+    Read-only sequence handed to subscribers: the version that changed, with the
+    items built only when a subscriber actually reads them. A late reader sees
+    the data of that version or a newer one.
+    """
+    
+    __slots__ = ("version", "_manager", "_data_type", "_items")
+    
+    def __init__(self, manager: "DataManager", data_type: str, version: int):
+        self.version = version
+        self._manager = manager
+        self._data_type = data_type
+        self._items: Optional[Tuple[Mapping[str, Any], ...]] = None
+    
+    @property
+    def items(self) -> Tuple[Mapping[str, Any], ...]:
+        if self._items is None:
+            self._items = self._manager.get_snapshot(self._data_type).items
+        return self._items
+    
+    def __getitem__(self, index):
+        return self.items[index]
+    
+    def __iter__(self):
+        return iter(self.items)
+    
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+def freeze_record(record: Mapping[str, Any]) -> Dict[str, Any]:
+    """Private copy of a record with list values turned into tuples"""
+    return {key: tuple(value) if isinstance(value, list) else value for key, value in record.items()}
+
 
 class DataManager:
     """
@@ -11,8 +64,14 @@ class DataManager:
     with caching and automatic synchronization
     """
     
-    def __init__(self, config_static: Dict[str, Any]):
+    # Data types additionally kept as ordered id -> record indexes
+    INDEXED_KEYS = ('reminders', 'completed')
+    # config_dynamic key of the scheduler heartbeat (ISO time of the last run)
+    HEARTBEAT_KEY = 'last_run_at'
+    
+    def __init__(self, config_static: Dict[str, Any], clock: Optional[SystemClock] = None):
         self.config_static = config_static
+        self.clock = clock or SystemClock()  # Source of completion timestamps
         self._lock = threading.RLock()  # Reentrant lock for nested calls
         
         # In-memory data cache
@@ -20,6 +79,28 @@ class DataManager:
         self._cache_timestamps: Dict[str, float] = {}
         self._dirty_flags: Dict[str, bool] = {}
         
+        # Ordered id -> record indexes for INDEXED_KEYS. They are the source of truth,
+        # the list in self._cache is rebuilt from them lazily (None = stale)
+        self._index: Dict[str, Dict[Any, Dict[str, Any]]] = {key: {} for key in self.INDEXED_KEYS}
+        self._backlog_texts: set = set()
+        
+        # Reminders pre-parsed together with their last completion: id -> (record, completion, compiled),
+        # recompiled when either record is replaced. Plus the ordered tuple for (reminders, completed) versions
+        self._compiled: Dict[Any, tuple] = {}
+        self._compiled_list: Optional[Tuple[Tuple[int, int], Tuple[CompiledReminder, ...]]] = None
+        
+        # Published read-only snapshots (None = rebuild on next read) and their versions.
+        # Stored records are never mutated in place, only replaced
+        self._snapshots: Dict[str, Optional[Snapshot]] = {}
+        self._versions: Dict[str, int] = {}
+        
+        # Transaction state: writes and notifications are deferred until the outermost commit
+        self._tx_depth = 0
+        self._tx_ops: Dict[str, Optional[List[Dict[str, Any]]]] = {}
+        self._tx_notify: List[str] = []
+        self._tx_backup: Dict[str, tuple] = {}
+        self._tx_history: List[tuple] = []
+        
         # File paths
         self._file_paths = {
             'reminders': config_static["paths"]["notify_path"],
@@ -36,8 +117,38 @@ class DataManager:
             'config_dynamic': []
         }
         
+        # Persistence backend (json snapshots or append-only journal)
+        storage_config = config_static.get("storage", {})
+        self._storage = create_storage(self._file_paths, storage_config, self.clock)
+        
+        # Detects edits made to the data files behind the cache's back
+        self._watcher = FileWatcher()
+        
+        # Optional long-term completion log; completed.json keeps only the latest entry per id
+        history_config = config_static.get("history", {})
+        self._history: Optional[CompletionHistory] = None
+        if history_config.get("enabled", False):
+            self._history = CompletionHistory(history_config.get("path", "history"),
+                                              history_config.get("retention_months", 12), self.clock)
+        
+        # Write-behind: mutations are queued and coalesced into one write per data type
+        self._write_behind = storage_config.get("write_behind", False)
+        self._flush_delay = storage_config.get("flush_delay_sec", 1.0)
+        self._max_staleness = storage_config.get("max_staleness_sec", 5.0)
+        self._pending_ops: Dict[str, Optional[List[Dict[str, Any]]]] = {}  # None = full rewrite
+        self._dirty_since: Dict[str, float] = {}
+        self._last_change: Dict[str, float] = {}
+        self._io_lock = threading.Lock()  # Serializes writes; always taken before self._lock
+        self._flush_cond = threading.Condition(self._lock)
+        self._closed = False
+        
         # Initialize cache
         self._initialize_cache()
+        
+        if self._write_behind:
+            self._flush_thread = threading.Thread(target=self._flush_loop, name="data-flush", daemon=True)
+            self._flush_thread.start()
+        atexit.register(self.close)
     
     def _initialize_cache(self):
         """Initialize cache from files"""
@@ -50,7 +161,7 @@ class DataManager:
     def _load_from_file(self, key: str, file_path: str) -> None:
         """Load data from file into cache"""
         try:
-            data = load_json(file_path, [])
+            data = self._read_from_storage(key)
             self._cache[key] = data
             self._cache_timestamps[key] = os.path.getmtime(file_path) if os.path.exists(file_path) else 0
             self._dirty_flags[key] = False
@@ -59,39 +170,333 @@ class DataManager:
             self._cache[key] = []
             self._cache_timestamps[key] = 0
             self._dirty_flags[key] = False
+        self._reindex(key)
+        self._invalidate(key)
     
-    def _save_to_file(self, key: str, file_path: str) -> None:
-        """Save data from cache to file"""
-        try:
-            save_json(file_path, self._cache[key])
-            self._cache_timestamps[key] = os.path.getmtime(file_path)
+    def _invalidate(self, key: str) -> None:
+        """Drop the published snapshot of key and bump its version"""
+        self._snapshots[key] = None
+        self._versions[key] = self._versions.get(key, 0) + 1
+    
+    def _read_from_storage(self, key: str) -> Any:
+        """Read data of key from storage and remember the file state"""
+        paths = self._storage.paths(key)
+        self._watcher.mark_seen(paths)
+        data = self._storage.load(key)
+        if isinstance(data, list):
+            data = [freeze_record(record) for record in data]
+        return data
+    
+    def _reindex(self, key: str) -> None:
+        """Rebuild the lookup index of key from the cached list"""
+        if key in self.INDEXED_KEYS:
+            index = {}
+            for record in self._data(key):
+                record_id = record.get("id")
+                # Records without id (or duplicates) keep their place under a private key
+                index[record_id if record_id is not None and record_id not in index else object()] = record
+            self._index[key] = index
+            if key == 'reminders':
+                self._compiled = {}
+            for reminder_id in self._index['reminders']:
+                self._compile(reminder_id)
+        elif key == 'backlog':
+            self._backlog_texts = {item.get("text", "").lower() for item in self._cache[key]}
+    
+    def _compile(self, reminder_id: Any) -> Optional[CompiledReminder]:
+        """Compiled form of a reminder, parsed again only if the reminder or its completion was replaced"""
+        record = self._index['reminders'].get(reminder_id)
+        if record is None:
+            self._compiled.pop(reminder_id, None)
+            return None
+        completion = self._index['completed'].get(reminder_id)
+        entry = self._compiled.get(reminder_id)
+        if entry is not None and entry[0] is record and entry[1] is completion:
+            return entry[2]
+        completion_view = MappingProxyType(completion) if completion is not None else None
+        if entry is not None and entry[0] is record:
+            compiled = entry[2].with_completion(completion_view)
+        else:
+            compiled = CompiledReminder(MappingProxyType(record), completion_view)
+        self._compiled[reminder_id] = (record, completion, compiled)
+        return compiled
+    
+    def _data(self, key: str) -> Any:
+        """Cached data for key, rebuilding the list from the index if it is stale"""
+        if self._cache.get(key) is None and key in self.INDEXED_KEYS:
+            self._cache[key] = list(self._index[key].values())
+        return self._cache.get(key)
+    
+    def _save_to_file(self, key: str, file_path: str, ops: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Save data from cache to file, ops describe single-record mutations for journal storage"""
+        if self._tx_depth:
+            self._merge_ops(self._tx_ops, key, ops)
+            return
+        if self._write_behind and not self._closed:
+            self._queue_write(key, ops)
+            return
+        if key in self._pending_ops:
+            # An earlier write of key failed, retry it together with this one
+            self._merge_ops(self._pending_ops, key, ops)
+            ops = self._pending_ops.pop(key)
+        if self._write_to_storage(key, file_path, self._data(key), ops):
             self._dirty_flags[key] = False
+        else:
+            self._requeue_write(key, ops)
+    
+    def _write_to_storage(self, key: str, file_path: str, data: Any, ops: Optional[List[Dict[str, Any]]]) -> bool:
+        """Write data through the storage backend, returns False if the write failed"""
+        try:
+            self._storage.write(key, data, ops)
+            self._watcher.mark_seen(self._storage.paths(key))
+            self._cache_timestamps[key] = os.path.getmtime(file_path) if os.path.exists(file_path) else 0
+            return True
         except Exception as e:
             print(f"Error saving {key} to {file_path}: {e}")
+            return False
+    
+    def _requeue_write(self, key: str, ops: Optional[List[Dict[str, Any]]]) -> None:
+        """
+        Put the ops of a failed write back in front of the writes queued since,
+        so they are retried (after the flush delay, or by the next save) instead of lost
+        """
+        with self._lock:
+            newer = self._pending_ops.pop(key, [])
+            self._pending_ops[key] = list(ops) if ops is not None else None
+            self._merge_ops(self._pending_ops, key, newer)
+            now = time.monotonic()
+            self._dirty_flags[key] = True
+            self._dirty_since[key] = now
+            self._last_change[key] = now
+        with self._flush_cond:
+            self._flush_cond.notify()
+    
+    def _queue_write(self, key: str, ops: Optional[List[Dict[str, Any]]]) -> None:
+        """Queue a write for the flush thread, merging it with pending writes of the same type"""
+        now = time.monotonic()
+        self._merge_ops(self._pending_ops, key, ops)
+        self._dirty_flags[key] = True
+        self._dirty_since.setdefault(key, now)
+        self._last_change[key] = now
+        with self._flush_cond:
+            self._flush_cond.notify()
+    
+    @staticmethod
+    def _merge_ops(pending_ops: Dict[str, Optional[List[Dict[str, Any]]]], key: str,
+                   ops: Optional[List[Dict[str, Any]]]) -> None:
+        """Append ops to the pending ops of key; a full rewrite (None) absorbs everything"""
+        if key in pending_ops:
+            pending = pending_ops[key]
+            if pending is not None and ops is not None:
+                pending.extend(ops)
+            else:
+                pending_ops[key] = None
+        else:
+            pending_ops[key] = list(ops) if ops is not None else None
+    
+    def _flush_due_at(self, key: str) -> float:
+        """Monotonic time when pending writes for key must be flushed"""
+        return min(self._last_change[key] + self._flush_delay,
+                   self._dirty_since[key] + self._max_staleness)
+    
+    def _flush_loop(self) -> None:
+        """Background thread flushing queued writes after the flush delay"""
+        while not self._closed:
+            with self._flush_cond:
+                pending = list(self._pending_ops)
+                if pending:
+                    timeout = min(self._flush_due_at(key) for key in pending) - time.monotonic()
+                    if timeout > 0:
+                        self._flush_cond.wait(timeout)
+                else:
+                    self._flush_cond.wait()
+            if not self._closed:
+                self.flush(due_only=True)
+    
+    def flush(self, due_only: bool = False) -> None:
+        """Write queued changes, coalesced into one write per data type"""
+        with self._io_lock:
+            with self._lock:
+                now = time.monotonic()
+                batch = []
+                for key in list(self._pending_ops):
+                    if due_only and self._flush_due_at(key) > now:
+                        continue
+                    ops = self._pending_ops.pop(key)
+                    self._dirty_since.pop(key, None)
+                    self._dirty_flags[key] = False
+                    data = self._data(key)
+                    data = copy.deepcopy(data) if isinstance(data, dict) else list(data)
+                    batch.append((key, data, ops))
+            for key, data, ops in batch:
+                if not self._write_to_storage(key, self._file_paths[key], data, ops):
+                    self._requeue_write(key, ops)
     
     def _notify_subscribers(self, key: str) -> None:
         """Notify subscribers about changes"""
-        if key in self._subscribers:
+        if self._tx_depth:
+            if key not in self._tx_notify:
+                self._tx_notify.append(key)
+            return
+        if self._subscribers.get(key):
+            # Building the snapshot is O(n): subscribers that only need to know
+            # about the change (e.g. the engine's wake-up) never pay for it
+            data = self._data(key) if key == 'config_dynamic' else self.get_lazy_snapshot(key)
             for callback in self._subscribers[key]:
                 try:
-                    callback(self._cache[key])
+                    callback(data)
                 except Exception as e:
                     print(f"Error in subscriber callback for {key}: {e}")
     
-    def get_reminders(self) -> List[Dict[str, Any]]:
-        """Get list of reminders"""
+    @contextmanager
+    def transaction(self):
+        """
+        Group mutations across data types: they are persisted once and subscribers
+        are notified once per affected type when the block exits. If the block
+        raises, the in-memory cache is rolled back and nothing is written.
+        Nested blocks join the outermost transaction.
+        """
         with self._lock:
-            return self._cache.get('reminders', []).copy()
+            outermost = self._tx_depth == 0
+            if outermost:
+                self._tx_ops = {}
+                self._tx_notify = []
+                self._tx_backup = {}
+                self._tx_history = []
+            self._tx_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._tx_depth -= 1
+                if outermost:
+                    self._rollback()
+                raise
+            self._tx_depth -= 1
+            if outermost:
+                self._commit()
     
-    def get_backlog(self) -> List[Dict[str, Any]]:
-        """Get backlog list"""
+    def _touch(self, key: str) -> None:
+        """Remember the state of key before its first change inside a transaction"""
+        if not self._tx_depth or key in self._tx_backup:
+            return
+        data = self._cache.get(key)
+        self._tx_backup[key] = (
+            list(data) if isinstance(data, list) else data,
+            dict(self._index[key]) if key in self.INDEXED_KEYS else None,
+            set(self._backlog_texts) if key == 'backlog' else None,
+            self._dirty_flags.get(key, False),
+        )
+    
+    def _rollback(self) -> None:
+        """Restore the cache to the state before the transaction"""
+        for key, (data, index, backlog_texts, dirty) in self._tx_backup.items():
+            self._cache[key] = data
+            if index is not None:
+                self._index[key] = index
+            if backlog_texts is not None:
+                self._backlog_texts = backlog_texts
+            self._dirty_flags[key] = dirty
+            self._invalidate(key)
+        self._tx_ops, self._tx_notify, self._tx_backup, self._tx_history = {}, [], {}, []
+    
+    def _commit(self) -> None:
+        """Persist and announce everything changed in the transaction"""
+        tx_ops, tx_notify, tx_history = self._tx_ops, self._tx_notify, self._tx_history
+        self._tx_ops, self._tx_notify, self._tx_backup, self._tx_history = {}, [], {}, []
+        for key, ops in tx_ops.items():
+            self._save_to_file(key, self._file_paths[key], ops)
+        for method, args in tx_history:
+            self._update_history(method, *args)
+        for key in tx_notify:
+            self._notify_subscribers(key)
+    
+    def _update_history(self, method: str, *args) -> None:
+        """Call a CompletionHistory method, deferred to commit inside a transaction"""
+        if self._history is None:
+            return
+        if self._tx_depth:
+            self._tx_history.append((method, args))
+            return
+        try:
+            getattr(self._history, method)(*args)
+        except Exception as e:
+            print(f"Error updating completion history: {e}")
+    
+    def get_completion_stats(self, reminder_id: str) -> Optional[Dict[str, Any]]:
+        """Get completion rollup of a reminder: count, last_fired and streak"""
+        return self._history.get_rollup(reminder_id) if self._history else None
+    
+    def get_completion_history(self, reminder_id: Optional[str] = None, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Get logged completions, optionally for one reminder and/or from a date"""
+        return list(self._history.iter_records(reminder_id, since)) if self._history else []
+    
+    def get_snapshot(self, data_type: str) -> Snapshot:
+        """Get the current read-only snapshot of a data type (lock-free unless it must be rebuilt)"""
+        snapshot = self._snapshots.get(data_type)
+        if snapshot is not None:
+            return snapshot
         with self._lock:
-            return self._cache.get('backlog', []).copy()
+            snapshot = self._snapshots.get(data_type)
+            if snapshot is None:
+                items = tuple(MappingProxyType(record) for record in self._data(data_type) or [])
+                snapshot = Snapshot(self._versions.get(data_type, 0), items)
+                self._snapshots[data_type] = snapshot
+            return snapshot
+    
+    def get_lazy_snapshot(self, data_type: str) -> LazySnapshot:
+        """Get the current snapshot without building its items until they are read"""
+        return LazySnapshot(self, data_type, self._versions.get(data_type, 0))
+    
+    def get_version(self, data_type: str) -> int:
+        """Get version of a data type, it changes on every modification"""
+        return self._versions.get(data_type, 0)
+    
+    def get_reminders(self) -> Tuple[Mapping[str, Any], ...]:
+        """Get list of reminders (read-only)"""
+        return self.get_snapshot('reminders').items
     
-    def get_completed(self) -> List[Dict[str, Any]]:
-        """Get list of completed notifications"""
+    def get_backlog(self) -> Tuple[Mapping[str, Any], ...]:
+        """Get backlog list (read-only)"""
+        return self.get_snapshot('backlog').items
+    
+    def get_completed(self) -> Tuple[Mapping[str, Any], ...]:
+        """Get list of completed notifications (read-only)"""
+        return self.get_snapshot('completed').items
+    
+    def get_reminder(self, reminder_id: str) -> Optional[Mapping[str, Any]]:
+        """Get reminder by ID (read-only)"""
+        record = self._index['reminders'].get(reminder_id)
+        return MappingProxyType(record) if record is not None else None
+    
+    def get_completed_entry(self, reminder_id: str) -> Optional[Mapping[str, Any]]:
+        """Get completed entry for a reminder ID (read-only)"""
+        record = self._index['completed'].get(reminder_id)
+        return MappingProxyType(record) if record is not None else None
+    
+    def get_compiled_reminder(self, reminder_id: str) -> Optional[CompiledReminder]:
+        """Get pre-parsed reminder by ID"""
+        with self._lock:
+            return self._compile(reminder_id)
+    
+    def get_compiled_reminders(self) -> Tuple[CompiledReminder, ...]:
+        """Get pre-parsed reminders in list order"""
         with self._lock:
-            return self._cache.get('completed', []).copy()
+            versions = (self._versions.get('reminders', 0), self._versions.get('completed', 0))
+            if self._compiled_list is None or self._compiled_list[0] != versions:
+                index = self._index['reminders']
+                if len(self._compiled) > len(index):
+                    self._compiled = {key: value for key, value in self._compiled.items() if key in index}
+                self._compiled_list = (versions, tuple(self._compile(key) for key in index))
+            return self._compiled_list[1]
+    
+    def get_agenda(self, start: datetime, end: datetime) -> Iterator[Occurrence]:
+        """Stream (datetime, reminder_id) occurrences of all reminders in [start, end) in time order"""
+        return iter_agenda(self.get_compiled_reminders(), start, end)
+    
+    def get_last_completed(self, reminder_id: str) -> Optional[str]:
+        """Get completed_at of the last completion of a reminder (one index lookup)"""
+        record = self._index['completed'].get(reminder_id)
+        return record.get("completed_at") if record is not None else None
     
     def get_config_dynamic(self) -> Dict[str, Any]:
         """Get dynamic configuration"""
@@ -101,7 +506,10 @@ class DataManager:
     def update_reminders(self, reminders: List[Dict[str, Any]]) -> None:
         """Update list of reminders"""
         with self._lock:
-            self._cache['reminders'] = reminders.copy()
+            self._touch('reminders')
+            self._cache['reminders'] = [freeze_record(record) for record in reminders]
+            self._reindex('reminders')
+            self._invalidate('reminders')
             self._dirty_flags['reminders'] = True
             self._save_to_file('reminders', self._file_paths['reminders'])
             self._notify_subscribers('reminders')
@@ -109,7 +517,10 @@ class DataManager:
     def update_backlog(self, backlog: List[Dict[str, Any]]) -> None:
         """Update backlog list"""
         with self._lock:
-            self._cache['backlog'] = backlog.copy()
+            self._touch('backlog')
+            self._cache['backlog'] = [freeze_record(record) for record in backlog]
+            self._reindex('backlog')
+            self._invalidate('backlog')
             self._dirty_flags['backlog'] = True
             self._save_to_file('backlog', self._file_paths['backlog'])
             self._notify_subscribers('backlog')
@@ -117,71 +528,103 @@ class DataManager:
     def update_completed(self, completed: List[Dict[str, Any]]) -> None:
         """Update list of completed notifications"""
         with self._lock:
-            self._cache['completed'] = completed.copy()
+            self._touch('completed')
+            self._cache['completed'] = [freeze_record(record) for record in completed]
+            self._reindex('completed')
+            self._invalidate('completed')
             self._dirty_flags['completed'] = True
             self._save_to_file('completed', self._file_paths['completed'])
             self._notify_subscribers('completed')
     
     def update_config_dynamic(self, config: Dict[str, Any]) -> None:
-        """Update dynamic configuration"""
+        """Update dynamic configuration (the scheduler heartbeat is kept, only set_last_run_at changes it)"""
+        with self._lock:
+            config = config.copy()
+            current = self._cache.get('config_dynamic')
+            if isinstance(current, dict) and self.HEARTBEAT_KEY in current:
+                config[self.HEARTBEAT_KEY] = current[self.HEARTBEAT_KEY]
+            self._write_config_dynamic(config)
+    
+    def get_last_run_at(self) -> Optional[datetime]:
+        """When the scheduler last ran (heartbeat), None if unknown"""
+        config = self._cache.get('config_dynamic')
+        value = config.get(self.HEARTBEAT_KEY) if isinstance(config, dict) else None
+        try:
+            return datetime.fromisoformat(value) if value else None
+        except (TypeError, ValueError):
+            return None
+    
+    def set_last_run_at(self, moment: datetime) -> None:
+        """Record the scheduler heartbeat: everything due before moment has been handled"""
         with self._lock:
-            self._cache['config_dynamic'] = config.copy()
-            self._dirty_flags['config_dynamic'] = True
-            self._save_to_file('config_dynamic', self._file_paths['config_dynamic'])
-            self._notify_subscribers('config_dynamic')
+            current = self._cache.get('config_dynamic')
+            config = dict(current) if isinstance(current, dict) else {}
+            config[self.HEARTBEAT_KEY] = moment.isoformat()
+            self._write_config_dynamic(config)
+    
+    def _write_config_dynamic(self, config: Dict[str, Any]) -> None:
+        """Replace the cached dynamic configuration (called with the lock held)"""
+        self._touch('config_dynamic')
+        self._cache['config_dynamic'] = config
+        self._invalidate('config_dynamic')
+        self._dirty_flags['config_dynamic'] = True
+        self._save_to_file('config_dynamic', self._file_paths['config_dynamic'])
+        self._notify_subscribers('config_dynamic')
     
-    def add_reminder(self, reminder: Dict[str, Any]) -> None:
+    def add_reminder(self, reminder: Mapping[str, Any]) -> None:
         """Add new reminder"""
+        reminder = freeze_record(reminder)
         with self._lock:
-            reminders = self._cache.get('reminders', [])
-            reminders.append(reminder)
-            self._cache['reminders'] = reminders
+            self._touch('reminders')
+            reminder_id = reminder.get('id')
+            key = reminder_id if reminder_id not in self._index['reminders'] else object()
+            self._index['reminders'][key] = reminder
+            self._compile(key)
+            self._cache['reminders'] = None
+            self._invalidate('reminders')
             self._dirty_flags['reminders'] = True
-            self._save_to_file('reminders', self._file_paths['reminders'])
+            self._save_to_file('reminders', self._file_paths['reminders'],
+                               [{"op": "append", "record": reminder}])
             self._notify_subscribers('reminders')
     
-    def update_reminder(self, reminder_id: str, updated_reminder: Dict[str, Any]) -> None:
+    def update_reminder(self, reminder_id: str, updated_reminder: Mapping[str, Any]) -> None:
         """Update an existing reminder"""
+        updated_reminder = freeze_record(updated_reminder)
         with self._lock:
-            reminders = self._cache.get('reminders', [])
-            
-            # Find and update the reminder
-            found = False
-            for i, reminder in enumerate(reminders):
-                if reminder.get('id') == reminder_id:
-                    reminders[i] = updated_reminder
-                    found = True
-                    break
-            
-            if not found:
+            index = self._index['reminders']
+            if reminder_id not in index:
                 return
             
-            self._cache['reminders'] = reminders
+            self._touch('reminders')
+            index[reminder_id] = updated_reminder
+            self._cache['reminders'] = None
+            if updated_reminder.get('id') != reminder_id:
+                self._reindex('reminders')
+            else:
+                self._compile(reminder_id)
+            self._invalidate('reminders')
             self._dirty_flags['reminders'] = True
-            self._save_to_file('reminders', self._file_paths['reminders'])
+            self._save_to_file('reminders', self._file_paths['reminders'],
+                               [{"op": "upsert", "id": reminder_id, "record": updated_reminder}])
             self._notify_subscribers('reminders')
     
     def remove_reminder(self, reminder_id: str) -> None:
         """Remove reminder by ID and clean up related data"""
-        with self._lock:
-            reminders = self._cache.get('reminders', [])
-            
-            # Find the reminder to get its text for backlog
-            reminder_to_remove = None
-            for reminder in reminders:
-                if reminder.get('id') == reminder_id:
-                    reminder_to_remove = reminder
-                    break
-            
-            # Remove from reminders
-            reminders = [r for r in reminders if r.get('id') != reminder_id]
-            self._cache['reminders'] = reminders
+        with self.transaction():
+            # Remove from reminders, keeping the record for backlog
+            self._touch('reminders')
+            reminder_to_remove = self._index['reminders'].pop(reminder_id, None)
+            self._compiled.pop(reminder_id, None)
+            self._cache['reminders'] = None
+            self._invalidate('reminders')
             self._dirty_flags['reminders'] = True
-            self._save_to_file('reminders', self._file_paths['reminders'])
+            self._save_to_file('reminders', self._file_paths['reminders'],
+                               [{"op": "remove", "id": reminder_id}])
             self._notify_subscribers('reminders')
             
             # Remove completed entries for this reminder
             self.remove_completed_entries_for_reminder(reminder_id)
+            self._update_history('forget', reminder_id)
             
             # Add to backlog if reminder was found
             if reminder_to_remove and reminder_to_remove.get('text'):
@@ -195,53 +638,74 @@ class DataManager:
         with self._lock:
             backlog = self._cache.get('backlog', [])
             # Check for duplicates (case-insensitive)
-            existing_texts = [item.get("text", "").lower() for item in backlog]
-            if text.lower() not in existing_texts:
-                backlog.append({"text": text})
+            if text.lower() not in self._backlog_texts:
+                self._touch('backlog')
+                record = {"text": text}
+                backlog.append(record)
+                self._backlog_texts.add(text.lower())
                 self._cache['backlog'] = backlog
+                self._invalidate('backlog')
                 self._dirty_flags['backlog'] = True
-                self._save_to_file('backlog', self._file_paths['backlog'])
+                self._save_to_file('backlog', self._file_paths['backlog'],
+                                   [{"op": "append", "record": record}])
                 self._notify_subscribers('backlog')
     
-    def add_completed_entry(self, reminder_id: str) -> None:
-        """Add or update entry for completed reminder (only one per id)"""
+    def add_completed_entry(self, reminder_id: str, completed_at: Optional[datetime] = None) -> None:
+        """Add or update entry for completed reminder (only one per id), completed now unless given"""
         with self._lock:
-            completed = self._cache.get('completed', [])
-            now = datetime.now()
+            self._touch('completed')
+            index = self._index['completed']
+            now = completed_at or self.clock.now()
             # Удаляем все старые записи с этим id
-            completed = [c for c in completed if c.get("id") != reminder_id]
+            index.pop(reminder_id, None)
             # Добавляем новую запись
-            completed.append({
+            record = {
                 "id": reminder_id,
                 "completed_at": now.isoformat()
-            })
-            self._cache['completed'] = completed
+            }
+            index[reminder_id] = record
+            self._compile(reminder_id)
+            reminder = self._index['reminders'].get(reminder_id)
+            self._update_history('record', reminder_id, now, reminder.get('recurrence_type') if reminder else None)
+            self._cache['completed'] = None
+            self._invalidate('completed')
             self._dirty_flags['completed'] = True
-            self._save_to_file('completed', self._file_paths['completed'])
+            self._save_to_file('completed', self._file_paths['completed'],
+                               [{"op": "remove", "id": reminder_id}, {"op": "append", "record": record}])
             self._notify_subscribers('completed')
 
     def remove_completed_entries_for_reminder(self, reminder_id: str) -> None:
         """Remove all completed entries for a specific reminder (when reminder is deleted)"""
         with self._lock:
-            completed = self._cache.get('completed', [])
-            # Remove all entries for this reminder ID
-            completed = [c for c in completed if c.get("id") != reminder_id]
+            # Remove the entry for this reminder ID
+            if reminder_id not in self._index['completed']:
+                return
             
-            self._cache['completed'] = completed
+            self._touch('completed')
+            self._index['completed'].pop(reminder_id)
+            self._compile(reminder_id)
+            self._cache['completed'] = None
+            self._invalidate('completed')
             self._dirty_flags['completed'] = True
-            self._save_to_file('completed', self._file_paths['completed'])
+            self._save_to_file('completed', self._file_paths['completed'],
+                               [{"op": "remove", "id": reminder_id}])
             self._notify_subscribers('completed')
 
     def remove_completed_entry(self, reminder_id: str) -> None:
         """Remove completed entry for a specific reminder (when reminder is edited)"""
         with self._lock:
-            completed = self._cache.get('completed', [])
-            # Remove all entries for this reminder ID
-            completed = [c for c in completed if c.get("id") != reminder_id]
+            # Remove the entry for this reminder ID
+            if reminder_id not in self._index['completed']:
+                return
             
-            self._cache['completed'] = completed
+            self._touch('completed')
+            self._index['completed'].pop(reminder_id)
+            self._compile(reminder_id)
+            self._cache['completed'] = None
+            self._invalidate('completed')
             self._dirty_flags['completed'] = True
-            self._save_to_file('completed', self._file_paths['completed'])
+            self._save_to_file('completed', self._file_paths['completed'],
+                               [{"op": "remove", "id": reminder_id}])
             self._notify_subscribers('completed')
     
     def subscribe(self, data_type: str, callback: Callable) -> None:
@@ -256,6 +720,7 @@ class DataManager:
     
     def refresh_data(self, data_type: Optional[str] = None) -> None:
         """Force update data from files"""
+        self.flush()
         with self._lock:
             if data_type:
                 if data_type in self._file_paths:
@@ -265,6 +730,35 @@ class DataManager:
                 for key, file_path in self._file_paths.items():
                     self._load_from_file(key, file_path)
     
+    def check_external_changes(self) -> List[str]:
+        """
+        Reload data types whose files were changed by someone else and notify
+        subscribers of the ones whose content really differs. Types with unsaved
+        changes are skipped, the in-memory state wins for them.
+        Returns the changed data types.
+        """
+        changed = []
+        with self._lock:
+            if self._tx_depth:
+                return changed
+            for key in self._file_paths:
+                if key in self._pending_ops or not self._watcher.changed(self._storage.paths(key)):
+                    continue
+                try:
+                    data = self._read_from_storage(key)
+                except Exception as e:
+                    print(f"Error reloading {key}: {e}")
+                    continue
+                if data == self._data(key):
+                    continue
+                self._cache[key] = data
+                self._reindex(key)
+                self._invalidate(key)
+                changed.append(key)
+            for key in changed:
+                self._notify_subscribers(key)
+        return changed
+    
     def get_backlog_suggestions(self, prefix: str = "", limit: int = 5) -> List[str]:
         """Get suggestions from backlog"""
         with self._lock:
@@ -284,28 +778,42 @@ class DataManager:
     
     def force_save_all(self) -> None:
         """Force save all changed data"""
+        self.flush()
         with self._lock:
             for key, file_path in self._file_paths.items():
                 if self._dirty_flags.get(key, False):
                     self._save_to_file(key, file_path)
+        if self._history:
+            self._history.flush()
+    
+    def close(self) -> None:
+        """Save pending changes and release storage (compacts the journal)"""
+        if self._closed:
+            return
+        self.force_save_all()
+        with self._flush_cond:
+            self._closed = True
+            self._flush_cond.notify()
+        self.flush()
+        self._storage.close()
     
     def _cleanup_outdated_completed(self):
         """Remove completed entries for non-existent reminders"""
-        reminders = self._cache.get('reminders', [])
-        completed = self._cache.get('completed', [])
+        reminders = self._index['reminders']
+        completed = self._data('completed')
         
         if not reminders or not completed:
             return
         
-        # Get current reminder IDs
-        current_ids = {reminder.get("id") for reminder in reminders if reminder.get("id")}
-        
         # Filter out outdated entries
-        valid_completed = [entry for entry in completed if entry.get("id") in current_ids]
+        valid_completed = [entry for entry in completed if entry.get("id") in reminders]
         
         # Update if there were changes
         if len(valid_completed) != len(completed):
+            self._touch('completed')
             self._cache['completed'] = valid_completed
+            self._reindex('completed')
+            self._invalidate('completed')
             self._dirty_flags['completed'] = True
             self._save_to_file('completed', self._file_paths['completed'])
             self._notify_subscribers('completed') 
\ No newline at end of file
@@ -0,0 +1,32 @@
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+Signature = Optional[Tuple[int, int]]
+
+
+class FileWatcher:
+    """
+    Cheap out-of-band change detection by polling file signatures (mtime, size).
+    A poll costs one os.stat per watched file.
+    """
+
+    def __init__(self):
+        self._seen: Dict[str, Signature] = {}
+
+    @staticmethod
+    def signature(path: str) -> Signature:
+        """Current (mtime_ns, size) of a file, None if it does not exist"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def mark_seen(self, paths: Iterable[str]) -> None:
+        """Remember the current state of paths (after our own read or write)"""
+        for path in paths:
+            self._seen[path] = self.signature(path)
+
+    def changed(self, paths: Iterable[str]) -> bool:
+        """Check if any of paths changed since it was last marked as seen"""
+        return any(path in self._seen and self.signature(path) != self._seen[path] for path in paths)
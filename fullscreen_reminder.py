@@ -1,7 +1,9 @@
-import os
 from PyQt6 import QtWidgets, QtGui, QtCore
+from icon_cache import get_pixmap
 
 class FullscreenReminder(QtWidgets.QWidget):
+    closed = QtCore.pyqtSignal()
+
     def __init__(self, text, icon_path, config):
         super().__init__()
         self.setWindowFlags(QtCore.Qt.WindowType.FramelessWindowHint)
@@ -9,6 +11,10 @@ class FullscreenReminder(QtWidgets.QWidget):
         self.showFullScreen()
 
         fr_config = config["fullscreen_reminder"]
+        self.text_color = fr_config["text_color"]
+        # Several reminders in one window are listed with a smaller font
+        self.font_size = fr_config.get("font_size", 48)
+        self.list_font_size = fr_config.get("list_font_size", 32)
         palette = QtGui.QPalette()
         palette.setColor(QtGui.QPalette.ColorRole.Window, QtGui.QColor(fr_config["bg_color"]))
         self.setPalette(palette)
@@ -19,27 +25,43 @@ class FullscreenReminder(QtWidgets.QWidget):
         main_layout.addStretch(1)
 
         content_widget = QtWidgets.QWidget()
-        content_layout = QtWidgets.QVBoxLayout(content_widget)
-        content_layout.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        self.content_layout = QtWidgets.QVBoxLayout(content_widget)
+        self.content_layout.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+        self.text_labels = []
+        self.add_item(text, icon_path)
+
+        main_layout.addWidget(content_widget, alignment=QtCore.Qt.AlignmentFlag.AlignCenter)
+
+        main_layout.addStretch(1)
+
+        self.setLayout(main_layout)
+        self.mousePressEvent = self.close_on_click
 
-        if icon_path and os.path.exists(icon_path):
+    def add_item(self, text, icon_path=None):
+        """Show another reminder in this window"""
+        icon_size = 64 if not self.text_labels else 32
+        pixmap = get_pixmap(icon_path, icon_size)
+        if pixmap is not None:
             icon_label = QtWidgets.QLabel()
-            pixmap = QtGui.QPixmap(icon_path).scaled(64, 64, QtCore.Qt.AspectRatioMode.KeepAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
             icon_label.setPixmap(pixmap)
             icon_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-            content_layout.addWidget(icon_label)
+            self.content_layout.addWidget(icon_label)
 
         text_label = QtWidgets.QLabel(text, self)
         text_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-        text_label.setStyleSheet(f"color: {fr_config['text_color']}; font-size: 48px;")
-        content_layout.addWidget(text_label)
+        self.content_layout.addWidget(text_label)
+        self.text_labels.append(text_label)
 
-        main_layout.addWidget(content_widget, alignment=QtCore.Qt.AlignmentFlag.AlignCenter)
+        font_size = self.font_size if len(self.text_labels) == 1 else self.list_font_size
+        for label in self.text_labels:
+            label.setStyleSheet(f"color: {self.text_color}; font-size: {font_size}px;")
 
-        main_layout.addStretch(1)
-
-        self.setLayout(main_layout)
-        self.mousePressEvent = self.close_on_click
+    def item_count(self):
+        return len(self.text_labels)
 
     def close_on_click(self, event):
-        self.close()
\ No newline at end of file
+        self.close()
+
+    def closeEvent(self, event):
+        super().closeEvent(event)
+        self.closed.emit()
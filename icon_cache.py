@@ -0,0 +1,144 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from PyQt6 import QtGui, QtCore
+
+
+class IconCache:
+    """
+    Process-wide cache of icons and scaled pixmaps keyed by (path, size).
+
+    Pixmaps and icons are kept in LRU order and evicted beyond max_entries;
+    file existence checks are remembered, a missing file is not looked up
+    again until invalidate(). warm_up() decodes images on a background thread
+    (QImage is safe off the GUI thread, QPixmap is not), so the first paint
+    only has to convert and scale them.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._exists: Dict[str, bool] = {}
+        self._images: Dict[str, QtGui.QImage] = {}  # decoded by warm_up()
+        self._pixmaps: "OrderedDict[Tuple[str, Optional[int]], QtGui.QPixmap]" = OrderedDict()
+        self._icons: "OrderedDict[str, QtGui.QIcon]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def exists(self, path: Optional[str]) -> bool:
+        """Memoized os.path.exists"""
+        if not path:
+            return False
+        with self._lock:
+            exists = self._exists.get(path)
+        if exists is None:
+            exists = os.path.exists(path)
+            with self._lock:
+                self._exists[path] = exists
+        return exists
+
+    def _remember(self, cache: OrderedDict, key, value) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def pixmap(self, path: Optional[str], size: Optional[int] = None) -> Optional[QtGui.QPixmap]:
+        """Pixmap of an image file scaled to fit size x size (original size if None), None if missing"""
+        if not self.exists(path):
+            return None
+        key = (path, size)
+        with self._lock:
+            pixmap = self._pixmaps.get(key)
+            if pixmap is not None:
+                self._pixmaps.move_to_end(key)
+                self.hits += 1
+                return pixmap
+            self.misses += 1
+            image = self._images.get(path)
+        pixmap = QtGui.QPixmap.fromImage(image) if image is not None else QtGui.QPixmap(path)
+        if pixmap.isNull():
+            return None
+        if size is not None:
+            pixmap = pixmap.scaled(size, size, QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                                   QtCore.Qt.TransformationMode.SmoothTransformation)
+        with self._lock:
+            self._remember(self._pixmaps, key, pixmap)
+        return pixmap
+
+    def icon(self, path: Optional[str]) -> Optional[QtGui.QIcon]:
+        """QIcon of an image file, None if missing"""
+        if not self.exists(path):
+            return None
+        with self._lock:
+            icon = self._icons.get(path)
+            if icon is not None:
+                self._icons.move_to_end(path)
+                self.hits += 1
+                return icon
+            self.misses += 1
+        icon = QtGui.QIcon(path)
+        with self._lock:
+            self._remember(self._icons, path, icon)
+        return icon
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Forget one file (or everything), e.g. after it was replaced on disk"""
+        with self._lock:
+            if path is None:
+                self._exists.clear()
+                self._images.clear()
+                self._pixmaps.clear()
+                self._icons.clear()
+                return
+            self._exists.pop(path, None)
+            self._images.pop(path, None)
+            for key in [key for key in self._pixmaps if key[0] == path]:
+                del self._pixmaps[key]
+            self._icons.pop(path, None)
+
+    def warm_up(self, paths: Iterable[Optional[str]]) -> threading.Thread:
+        """Check and decode image files on a background thread"""
+        paths = list(dict.fromkeys(path for path in paths if path))
+        thread = threading.Thread(target=self._warm, args=(paths,), name="icon-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def _warm(self, paths) -> None:
+        for path in paths[:self.max_entries]:
+            if not self.exists(path):
+                continue
+            image = QtGui.QImage(path)
+            if not image.isNull():
+                with self._lock:
+                    self._images.setdefault(path, image)
+
+
+_cache = IconCache()
+
+
+def configure(config_static) -> IconCache:
+    """Apply the icon_cache section of config_static"""
+    _cache.max_entries = config_static.get("icon_cache", {}).get("max_entries", _cache.max_entries)
+    return _cache
+
+
+def get_cache() -> IconCache:
+    return _cache
+
+
+def get_pixmap(path: Optional[str], size: Optional[int] = None) -> Optional[QtGui.QPixmap]:
+    return _cache.pixmap(path, size)
+
+
+def get_icon(path: Optional[str]) -> Optional[QtGui.QIcon]:
+    return _cache.icon(path)
+
+
+def config_icon_paths(config_static) -> list:
+    """Every icon file referenced by config_static"""
+    paths = [path for path in config_static.get("paths", {}).values()
+             if isinstance(path, str) and path.lower().endswith((".png", ".svg", ".ico", ".jpg", ".jpeg"))]
+    paths += [icon.get("path") for icon in config_static.get("add_notify_dialog", {}).get("notify_icons", [])]
+    return paths
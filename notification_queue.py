@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Mapping, NamedTuple, Optional
+
+# Burst policies: merge simultaneous reminders into one window, or show them one by one
+MERGE = "merge"
+SERIAL = "serial"
+
+
+class Notification(NamedTuple):
+    reminder: Mapping[str, Any]
+    enqueued_at: float  # monotonic seconds
+
+
+class NotificationQueue:
+    """
+    Dispatch queue between the reminder engine and the notification windows.
+
+    push() may be called from any thread (the engine's worker); dispatch() runs
+    on the GUI thread and hands batches to the display callback:
+    - "merge": everything pending (up to max_batch) goes into one window, and
+      into the window that is already open if there is one;
+    - "serial": one reminder per window, the next one only after the previous
+      window was closed (window_closed()).
+    A batch is displayed at most once per min_interval, so a burst of reminders
+    never stacks up fullscreen windows.
+    """
+
+    def __init__(self, display: Callable[[List[Notification]], None], policy: str = MERGE,
+                 min_interval: float = 1.0, max_batch: int = 8, on_ready: Optional[Callable[[], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.display = display
+        self.policy = policy if policy in (MERGE, SERIAL) else MERGE
+        self.min_interval = min_interval
+        self.max_batch = max(1, max_batch)
+        # Called after push() so the owner can schedule dispatch() on its thread
+        self.on_ready = on_ready
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._pending: Deque[Notification] = deque()
+        self._window_open = False
+        self._last_display: Optional[float] = None
+        # Metrics
+        self._enqueued = 0
+        self._displayed = 0
+        self._batches = 0
+        self._max_depth = 0
+        self._latencies: Deque[float] = deque(maxlen=1000)  # time-to-display of recent notifications
+
+    def __len__(self):
+        return len(self._pending)
+
+    def push(self, reminder: Mapping[str, Any]) -> None:
+        """Queue a fired reminder"""
+        with self._lock:
+            self._pending.append(Notification(reminder, self.clock()))
+            self._enqueued += 1
+            self._max_depth = max(self._max_depth, len(self._pending))
+        if self.on_ready:
+            self.on_ready()
+
+    def window_closed(self) -> None:
+        """The current notification window was closed"""
+        self._window_open = False
+
+    def dispatch(self) -> Optional[float]:
+        """
+        Display what the policy allows now. Returns the seconds to wait before
+        the next dispatch() if notifications are still pending, otherwise None
+        (including when a serial window has to be closed first).
+        """
+        now = self.clock()
+        with self._lock:
+            if not self._pending:
+                return None
+            if self.policy == SERIAL and self._window_open:
+                return None
+            if self._last_display is not None:
+                wait = self._last_display + self.min_interval - now
+                if wait > 0:
+                    return wait
+            size = 1 if self.policy == SERIAL else self.max_batch
+            batch = [self._pending.popleft() for _ in range(min(size, len(self._pending)))]
+            self._last_display = now
+            self._window_open = True
+            self._batches += 1
+            self._displayed += len(batch)
+            self._latencies.extend(now - item.enqueued_at for item in batch)
+            remaining = len(self._pending)
+        try:
+            self.display(batch)
+        except Exception as e:
+            print(f"Error displaying notifications: {e}")
+            self._window_open = False
+        if not remaining or (self.policy == SERIAL and self._window_open):
+            return None
+        return self.min_interval
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth and time-to-display statistics"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "depth": len(self._pending),
+                "max_depth": self._max_depth,
+                "enqueued": self._enqueued,
+                "displayed": self._displayed,
+                "batches": self._batches,
+                "time_to_display_mean_sec": sum(latencies) / len(latencies) if latencies else 0.0,
+                "time_to_display_p95_sec": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+                "time_to_display_max_sec": latencies[-1] if latencies else 0.0,
+            }
@@ -1,3 +1,4 @@
+import calendar
 import datetime
 
 class ReminderChecker:
@@ -74,7 +75,8 @@ class ReminderChecker:
                     return False
             except Exception:
                 return False
-        if now.day < monthly_day:
+        effective_day = ReminderChecker.get_effective_day_of_month(now.year, now.month, monthly_day)
+        if now.day < effective_day:
             return False
         return (now.hour, now.minute) >= (hour, minute)
 
@@ -113,4 +115,264 @@ class ReminderChecker:
             days_in_month = (next_month - datetime.timedelta(days=1)).day
             return min(day, days_in_month)
         except ValueError:
-            return day 
\ No newline at end of file
+            return day 
+
+    @staticmethod
+    def is_due(reminder, now, last_completed_at=None):
+        """Check if a reminder of any recurrence type is due at now"""
+        recurrence_type = reminder.get("recurrence_type")
+        if recurrence_type == "once":
+            return ReminderChecker.one_time(reminder, now)
+        elif recurrence_type == "daily":
+            return ReminderChecker.daily(reminder, now, last_completed_at)
+        elif recurrence_type == "weekly":
+            return ReminderChecker.weekly(reminder, now, last_completed_at)
+        elif recurrence_type == "monthly":
+            return ReminderChecker.monthly(reminder, now, last_completed_at)
+        elif recurrence_type == "yearly":
+            return ReminderChecker.yearly(reminder, now, last_completed_at)
+        else:
+            return True
+
+    @staticmethod
+    def next_fire_time(reminder, after, last_completed_at=None):
+        """
+        Earliest moment at or after `after` at which is_due() becomes true,
+        `after` itself if the reminder is already due, None if it never fires
+        """
+        completion = {"completed_at": last_completed_at} if last_completed_at else None
+        return CompiledReminder(reminder, completion).next_fire_time(after)
+
+    @staticmethod
+    def get_due_minute(time_str):
+        """First minute of the day (0-1439) at which (hour, minute) >= the reminder time, None if never"""
+        if not time_str:
+            return None
+        try:
+            hour, minute = map(int, time_str.split(":"))
+        except ValueError:
+            return None
+        if hour < 0:
+            return 0
+        if minute > 59:
+            hour, minute = hour + 1, 0
+        if hour > 23:
+            return None
+        return hour * 60 + max(minute, 0)
+
+    @staticmethod
+    def _fire_on(day, due_minute, after):
+        """Fire time on a given day, or `after` when it already passed on after's own day"""
+        candidate = datetime.datetime.combine(day, datetime.time(due_minute // 60, due_minute % 60))
+        if day == after.date() and (after.hour * 60 + after.minute) >= due_minute:
+            return after
+        return candidate
+
+
+ALL_WEEKDAYS = 0x7F
+
+
+class CompiledReminder:
+    """
+    Reminder record parsed once (time of day, dates, weekday mask, last completion)
+    so the due and completed checks are plain integer comparisons.
+    Built by DataManager when a reminder or its completion changes and shared
+    by the checker and the list dialog. Same results as the ReminderChecker predicates.
+    """
+
+    __slots__ = ("source", "completion_source", "id", "recurrence_type", "due_minute", "time_of_day",
+                 "fire_at", "date_ordinal", "weekday_mask", "monthly_day", "yearly_month", "yearly_day",
+                 "completed_epoch", "completed_ordinal", "completed_month", "completed_year", "completed_invalid",
+                 "_next_fire")
+
+    def __init__(self, reminder, completion=None):
+        self.source = reminder
+        self.id = reminder.get("id")
+        self.recurrence_type = reminder.get("recurrence_type")
+        time_str = reminder.get("time")
+        date_str = reminder.get("date")
+
+        # Recurring reminders are due from this minute of the day (None = never)
+        self.due_minute = ReminderChecker.get_due_minute(time_str)
+        self.time_of_day = None
+        if time_str:
+            try:
+                self.time_of_day = datetime.datetime.fromisoformat(f"2000-01-01T{time_str}:00").time()
+            except ValueError:
+                pass
+
+        # Exact moment of a dated reminder, the one-time fire time
+        self.fire_at = None
+        if date_str:
+            try:
+                self.fire_at = datetime.datetime.fromisoformat(f"{date_str}T{time_str or '00:00'}:00")
+            except ValueError:
+                pass
+        self.date_ordinal = self.fire_at.toordinal() if self.fire_at else None
+
+        weekly_days = reminder.get("weekly_days", [])
+        if weekly_days:
+            self.weekday_mask = 0
+            for day in weekly_days:
+                if isinstance(day, int) and 0 <= day < 7:
+                    self.weekday_mask |= 1 << day
+        else:
+            self.weekday_mask = ALL_WEEKDAYS
+        self.monthly_day = reminder.get("monthly_day", 1)
+        self.yearly_month = reminder.get("yearly_month", 1)
+        self.yearly_day = reminder.get("yearly_day", 1)
+        self._set_completion(completion)
+
+    def _set_completion(self, completion):
+        self.completion_source = completion
+        self._next_fire = None
+        self.completed_epoch = None
+        self.completed_ordinal = None
+        self.completed_month = None
+        self.completed_year = None
+        self.completed_invalid = False
+        completed_at = completion.get("completed_at") if completion else None
+        if not completed_at:
+            return
+        try:
+            completed_dt = datetime.datetime.fromisoformat(completed_at)
+        except Exception:
+            self.completed_invalid = True
+            return
+        self.completed_epoch = completed_dt.timestamp()
+        self.completed_ordinal = completed_dt.toordinal()
+        self.completed_month = completed_dt.year * 12 + completed_dt.month
+        self.completed_year = completed_dt.year
+
+    def with_completion(self, completion):
+        """Copy with another completion record, the reminder itself is not parsed again"""
+        compiled = CompiledReminder.__new__(CompiledReminder)
+        for name in self.__slots__:
+            setattr(compiled, name, getattr(self, name))
+        compiled._set_completion(completion)
+        return compiled
+
+    @property
+    def has_completion(self):
+        return self.completion_source is not None
+
+    def _effective_day(self, year, month, day):
+        if isinstance(day, int) and day <= 28:
+            return day
+        return ReminderChecker.get_effective_day_of_month(year, month, day)
+
+    def is_due(self, now):
+        """Same as ReminderChecker.is_due(reminder, now, last_completed_at)"""
+        recurrence_type = self.recurrence_type
+        if recurrence_type == "once":
+            return self.fire_at is not None and now >= self.fire_at
+        if recurrence_type not in ("daily", "weekly", "monthly", "yearly"):
+            return True
+        if self.due_minute is None or now.hour * 60 + now.minute < self.due_minute:
+            return False
+        if recurrence_type == "daily":
+            return not self.completed_invalid and self.completed_ordinal != now.toordinal()
+        if recurrence_type == "weekly":
+            return bool(self.weekday_mask >> now.weekday() & 1) and self.completed_ordinal != now.toordinal()
+        if self.completed_invalid:
+            return False
+        if recurrence_type == "monthly":
+            return (self.completed_month != now.year * 12 + now.month
+                    and now.day >= self._effective_day(now.year, now.month, self.monthly_day))
+        return (self.completed_year != now.year and now.month == self.yearly_month
+                and now.day >= self._effective_day(now.year, self.yearly_month, self.yearly_day))
+
+    def next_fire_time(self, after):
+        """
+        Earliest moment at or after `after` at which is_due() becomes true,
+        `after` itself if the reminder is already due, None if it never fires.
+        The one implementation of the recurrence rules, used by the scheduler,
+        the agenda and ReminderChecker.next_fire_time.
+
+        The last answer is kept: nothing is due between its `after` and its fire
+        time, so any `after` in between gets the same fire time. The list dialog
+        reuses the deadlines the scheduler computed this way.
+        """
+        cached = self._next_fire
+        if cached is not None and cached[0] <= after < cached[1]:
+            return cached[1]
+        fire_time = self._next_fire_time(after)
+        if fire_time is not None and fire_time > after:
+            self._next_fire = (after, fire_time)
+        return fire_time
+
+    def _next_fire_time(self, after):
+        recurrence_type = self.recurrence_type
+        if recurrence_type == "once":
+            return max(after, self.fire_at) if self.fire_at is not None else None
+        if recurrence_type not in ("daily", "weekly", "monthly", "yearly"):
+            return after
+        due_minute = self.due_minute
+        if due_minute is None:
+            return None
+        # Same as is_due: an unreadable completion blocks everything but weekly
+        if self.completed_invalid and recurrence_type != "weekly":
+            return None
+        day = after.date()
+
+        if recurrence_type == "daily":
+            if self.completed_ordinal == day.toordinal():
+                day += datetime.timedelta(days=1)
+            return ReminderChecker._fire_on(day, due_minute, after)
+
+        if recurrence_type == "weekly":
+            for _ in range(14):
+                if self.weekday_mask >> day.weekday() & 1 and self.completed_ordinal != day.toordinal():
+                    return ReminderChecker._fire_on(day, due_minute, after)
+                day += datetime.timedelta(days=1)
+            return None
+
+        if recurrence_type == "monthly":
+            year, month = after.year, after.month
+            for _ in range(14):
+                if self.completed_month != year * 12 + month:
+                    effective_day = max(1, self._effective_day(year, month, self.monthly_day))
+                    fire_day = max(day, datetime.date(year, month, effective_day))
+                    return ReminderChecker._fire_on(fire_day, due_minute, after)
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            return None
+
+        yearly_month = self.yearly_month
+        if yearly_month not in range(1, 13):
+            return None
+        for year in range(after.year, after.year + 9):
+            if self.completed_year == year:
+                continue
+            effective_day = max(1, self._effective_day(year, yearly_month, self.yearly_day))
+            last_day = datetime.date(year, yearly_month, calendar.monthrange(year, yearly_month)[1])
+            fire_day = max(day, datetime.date(year, yearly_month, effective_day))
+            if fire_day <= last_day:
+                return ReminderChecker._fire_on(fire_day, due_minute, after)
+        return None
+
+    def is_completed(self, now):
+        """Whether the reminder is done (or not scheduled) for the current period"""
+        recurrence_type = self.recurrence_type
+        if recurrence_type == "once":
+            return self.has_completion
+        if recurrence_type == "weekly" and not self.weekday_mask >> now.weekday() & 1:
+            return True
+        if recurrence_type in ("daily", "weekly"):
+            return self.completed_ordinal == now.toordinal()
+        if recurrence_type == "monthly":
+            return self.completed_month == now.year * 12 + now.month
+        if recurrence_type == "yearly":
+            return self.completed_year == now.year
+        return False
+
+    def is_listable(self):
+        """Whether list_time() has a value: the reminder has a valid time (and date)"""
+        if self.recurrence_type != "once" and not self.source.get("date"):
+            return self.time_of_day is not None
+        return self.fire_at is not None and bool(self.source.get("time"))
+
+    def list_time(self, today):
+        """Time the reminder is listed under: its date, or today for undated recurring ones"""
+        if self.recurrence_type != "once" and not self.source.get("date"):
+            return datetime.datetime.combine(today, self.time_of_day) if self.time_of_day else None
+        return self.fire_at if self.source.get("time") else None
@@ -0,0 +1,424 @@
+import operator
+from PyQt6 import QtWidgets, QtGui, QtCore
+from agenda import next_occurrence
+from icon_cache import get_pixmap
+
+# Model role returning the ReminderRow of an index
+ROW_ROLE = QtCore.Qt.ItemDataRole.UserRole + 1
+SORT_KEY = operator.attrgetter("sort_key")
+
+
+def recurrence_text(reminder, config_static):
+    """Short human readable recurrence description"""
+    recurrence_type = reminder.get("recurrence_type")
+    if recurrence_type == "daily":
+        return "Daily"
+    elif recurrence_type == "weekly":
+        days = reminder.get("weekly_days", [])
+        if not days:
+            return "Weekly"
+        day_names = config_static["add_notify_dialog"]["week_days"]
+        selected_days = [day_names[day] for day in sorted(days)]
+        return f"Weekly ({', '.join(selected_days)})"
+    elif recurrence_type == "monthly":
+        day = reminder.get("monthly_day", 1)
+        return f"Monthly ({day}th)"
+    elif recurrence_type == "yearly":
+        month = reminder.get("yearly_month", 1)
+        day = reminder.get("yearly_day", 1)
+        month_names = config_static["add_notify_dialog"]["month_names"]
+        return f"Yearly ({month_names[month - 1]} {day})"
+    else:
+        return "One-time"
+
+
+class ReminderRow:
+    """
+    List state of one reminder. Only the sort key is computed for every reminder
+    (from the next fire time the scheduler usually already computed on the same
+    compiled record); the display state is computed when the row is painted.
+    """
+
+    __slots__ = ("key", "compiled", "computed_at", "is_completed", "next_time", "sort_key", "_is_overdue",
+                 "_info_text")
+
+    def __init__(self, key, compiled, now, today):
+        self.key = key
+        self.compiled = compiled
+        self.computed_at = now
+        self.is_completed = compiled.is_completed(now)
+        # Upcoming reminders are ordered by when they really fire next; reminders
+        # already due keep their scheduled time, so their order does not drift with the clock
+        self.next_time = next_time = next_occurrence(compiled, now)
+        sort_time = next_time if next_time is not None and next_time > now else compiled.list_time(today)
+        # Сортировка: невыполненные сверху, выполненные снизу
+        self.sort_key = (self.is_completed, sort_time)
+        self._is_overdue = None
+        self._info_text = None
+
+    @property
+    def is_overdue(self):
+        if self._is_overdue is None:
+            compiled = self.compiled
+            self._is_overdue = (compiled.recurrence_type == "once" and compiled.fire_at < self.computed_at
+                                and not self.is_completed)
+        return self._is_overdue
+
+    @property
+    def reminder(self):
+        return self.compiled.source
+
+    def still_valid(self, compiled, now):
+        """
+        Whether the row can be reused at now: same compiled record (so same
+        reminder and completion), same day, and its next occurrence not reached.
+        A row that was already due stays due until it is completed or the day ends.
+        """
+        return (compiled is self.compiled and self.computed_at <= now
+                and now.date() == self.computed_at.date()
+                and (self.next_time is None or now < self.next_time or self.next_time == self.computed_at))
+
+    def info_text(self, config_static):
+        """Time and recurrence info shown next to the title"""
+        if self._info_text is None:
+            reminder = self.compiled.source
+            info_parts = [reminder.get("time")]
+            if reminder.get("recurrence_type") != "once":
+                info_parts.append(recurrence_text(reminder, config_static))
+            elif reminder.get("date"):
+                info_parts.append(reminder["date"])
+            self._info_text = " • ".join(info_parts)
+        return self._info_text
+
+
+class ReminderListModel(QtCore.QAbstractListModel):
+    """
+    Sorted reminder rows for a QListView; rows are painted by ReminderItemDelegate.
+
+    update_reminders() diffs the new state against the current rows by reminder
+    id and only inserts, removes and refreshes the rows that changed, so the
+    view keeps its scroll position and selection.
+    """
+
+    # Above this many inserted/removed/changed rows a full reset is cheaper
+    MAX_INCREMENTAL_CHANGES = 500
+
+    def __init__(self, config_static, parent=None):
+        super().__init__(parent)
+        self.config_static = config_static
+        self.now = None
+        self._rows = []
+        self._invalid_warned = set()
+
+    def set_reminders(self, compiled_reminders, now):
+        """Replace all rows"""
+        self.beginResetModel()
+        self.now = now
+        self._rows = self.build_rows(compiled_reminders, now)
+        self.endResetModel()
+
+    def update_reminders(self, compiled_reminders, now):
+        """Apply the changes since the last update, keyed by reminder id"""
+        previous = {row.key: row for row in self._rows}
+        rows = self.build_rows(compiled_reminders, now, previous, ordered=False)
+        self.now = now
+        fresh = [row for row in rows if previous.get(row.key) is not row]
+        if not fresh and len(rows) == len(previous):
+            return
+        # Changed rows with an unchanged sort key are refreshed in place, the others move
+        refreshed = {row.key: row for row in fresh
+                     if row.key in previous and previous[row.key].sort_key == row.sort_key}
+        moved = sorted((row for row in fresh if row.key not in refreshed), key=SORT_KEY)
+        live_keys = {row.key for row in rows}
+        dropped = {key for key in previous if key not in live_keys}
+        dropped.update(row.key for row in moved if row.key in previous)
+        if len(dropped) + len(moved) + len(refreshed) > self.MAX_INCREMENTAL_CHANGES:
+            self.set_reminders(compiled_reminders, now)
+            return
+
+        # Remove deleted and moving rows, bottom-up in contiguous blocks
+        end = len(self._rows) - 1
+        while end >= 0 and dropped:
+            if self._rows[end].key not in dropped:
+                end -= 1
+                continue
+            start = end
+            while start > 0 and self._rows[start - 1].key in dropped:
+                start -= 1
+            self.beginRemoveRows(QtCore.QModelIndex(), start, end)
+            del self._rows[start:end + 1]
+            self.endRemoveRows()
+            end = start - 1
+
+        if refreshed:
+            for index, row in enumerate(self._rows):
+                new_row = refreshed.get(row.key)
+                if new_row is not None:
+                    self._rows[index] = new_row
+                    model_index = self.index(index)
+                    self.dataChanged.emit(model_index, model_index)
+
+        # Insert new and moving rows at their sorted position (after equal keys)
+        position = 0
+        index = 0
+        while index < len(moved):
+            position = self._insert_position(moved[index].sort_key, position)
+            end = index + 1
+            while end < len(moved) and self._insert_position(moved[end].sort_key, position) == position:
+                end += 1
+            self.beginInsertRows(QtCore.QModelIndex(), position, position + end - index - 1)
+            self._rows[position:position] = moved[index:end]
+            self.endInsertRows()
+            position += end - index
+            index = end
+
+    def _insert_position(self, sort_key, low=0):
+        """Index after the last row with a sort key <= sort_key (rows are sorted)"""
+        high = len(self._rows)
+        while low < high:
+            middle = (low + high) // 2
+            if sort_key < self._rows[middle].sort_key:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def build_rows(self, compiled_reminders, now, previous=None, ordered=True):
+        """Rows of the listable reminders in display order, reusing still valid previous rows"""
+        today = now.date()
+        rows = []
+        seen = set()
+        for compiled in compiled_reminders:
+            key = compiled.id
+            if key in seen:
+                # Duplicate ids (hand-edited files) still get a row of their own
+                key = (compiled.id, len(seen))
+            seen.add(key)
+            row = previous.get(key) if previous else None
+            if row is not None and row.still_valid(compiled, now):
+                rows.append(row)
+                continue
+            if compiled.is_listable():
+                rows.append(ReminderRow(key, compiled, now, today))
+            elif compiled.source.get("time") and compiled.id not in self._invalid_warned:
+                # Warned once per reminder, not on every refresh of the list
+                self._invalid_warned.add(compiled.id)
+                print(f"Warning: Invalid date/time for reminder {compiled.id}, skipping.")
+        if ordered:
+            rows.sort(key=SORT_KEY)
+        return rows
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def row_at(self, row):
+        return self._rows[row]
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return None
+        row = self._rows[index.row()]
+        if role == ROW_ROLE:
+            return row
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return row.reminder.get("text", "")
+        if role == QtCore.Qt.ItemDataRole.ToolTipRole and row.next_time:
+            return f"Next: {row.next_time:%Y-%m-%d %H:%M}"
+        return None
+
+
+class ReminderItemDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Paints a reminder row (icon, recurrence mark, title, info, edit/done buttons)
+    without creating widgets; button clicks are found by hit-testing.
+    """
+
+    edit_requested = QtCore.pyqtSignal(object)
+    done_requested = QtCore.pyqtSignal(object)
+
+    ROW_HEIGHT = 44
+    BUTTON_SIZE = 28
+
+    ROW_STYLE = {
+        "background": "#252525",
+        "alternate_background": "#1e1e1e",
+        "completed_background": "#1a1a1a",
+        "overdue_background": "#3e2e2e",
+        "hover_background": "#2e2e2e",
+        "selected_border": "#0d7377",
+        "title_color": "#ffffff",
+        "completed_title_color": "#444444",
+        "overdue_title_color": "#aa5555",
+        "title_font_size": 12,
+        "info_color": "#aaaaaa",
+        "info_font_size": 10,
+        "icon_color": "#ffffff",
+        "edit_button_background": "#3e3e3e",
+        "edit_button_border": "#444444",
+        "done_button_background": "#0d7377",
+        "done_button_border": "#1a8c99",
+    }
+
+    def __init__(self, config_static, parent=None):
+        super().__init__(parent)
+        self.config_static = config_static
+        self.tl_config = config_static["notify_list_dialog"]
+        # Row states are styled here instead of per-row stylesheets; colors are
+        # parsed once, fonts and metrics are built on first use
+        style = dict(self.ROW_STYLE, **self.tl_config.get("row_style", {}))
+        self.title_font_size = style.pop("title_font_size")
+        self.info_font_size = style.pop("info_font_size")
+        self.colors = {name: QtGui.QColor(value) for name, value in style.items()}
+        self._fonts = {}
+
+    def sizeHint(self, option, index):
+        return QtCore.QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def button_rects(self, rect):
+        """(edit, done) button rectangles of a row"""
+        size = self.BUTTON_SIZE
+        top = rect.top() + (rect.height() - size) // 2
+        done_rect = QtCore.QRect(rect.right() - 12 - size, top, size, size)
+        edit_rect = QtCore.QRect(done_rect.left() - 6 - size, top, size, size)
+        return edit_rect, done_rect
+
+    def paint(self, painter, option, index):
+        row = index.data(ROW_ROLE)
+        if row is None:
+            return
+        reminder = row.reminder
+        rect = option.rect.adjusted(1, 1, -1, -1)
+        hovered = bool(option.state & QtWidgets.QStyle.StateFlag.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+
+        colors = self.colors
+        if hovered:
+            bg_color = colors["hover_background"]
+        elif row.is_completed:
+            bg_color = colors["completed_background"]
+        elif row.is_overdue:
+            bg_color = colors["overdue_background"]
+        else:
+            bg_color = colors["background"] if index.row() % 2 == 0 else colors["alternate_background"]
+        if option.state & QtWidgets.QStyle.StateFlag.State_Selected:
+            painter.setPen(colors["selected_border"])
+        else:
+            painter.setPen(QtCore.Qt.PenStyle.NoPen)
+        painter.setBrush(bg_color)
+        painter.drawRoundedRect(QtCore.QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5), 6, 6)
+
+        x = rect.left() + 12
+        center_y = rect.top() + rect.height() // 2
+
+        # Icon
+        icon_rect = QtCore.QRect(x, center_y - 12, 24, 24)
+        pixmap = get_pixmap(reminder.get("icon"), 20)
+        if pixmap is not None:
+            self._draw_pixmap(painter, icon_rect, pixmap)
+        else:
+            self._draw_text(painter, icon_rect, "📅", 16, QtGui.QFont.Weight.Normal, colors["icon_color"],
+                            QtCore.Qt.AlignmentFlag.AlignCenter)
+        x += 24 + 8
+
+        # Recurrence indicator
+        if reminder.get("recurrence_type") != "once":
+            recurrence_rect = QtCore.QRect(x, center_y - 9, 18, 18)
+            pixmap = get_pixmap(self.config_static["paths"].get("recurring_icon"), 14)
+            if pixmap is not None:
+                self._draw_pixmap(painter, recurrence_rect, pixmap)
+            else:
+                self._draw_text(painter, recurrence_rect, "🔄", 12, QtGui.QFont.Weight.Normal, colors["icon_color"],
+                                QtCore.Qt.AlignmentFlag.AlignCenter)
+        x += 18 + 8
+
+        # Title and info
+        edit_rect, done_rect = self.button_rects(rect)
+        text_width = edit_rect.left() - 8 - x
+        if row.is_completed:
+            title_color = colors["completed_title_color"]
+        elif row.is_overdue:
+            title_color = colors["overdue_title_color"]
+        else:
+            title_color = colors["title_color"]
+        title_width = self._draw_text(painter, QtCore.QRect(x, rect.top(), text_width, rect.height()),
+                                      reminder.get("text", ""), self.title_font_size, QtGui.QFont.Weight.DemiBold,
+                                      title_color)
+        info_x = x + title_width + 8
+        info_text = row.info_text(self.config_static)
+        self._draw_text(painter, QtCore.QRect(info_x, rect.top(), x + text_width - info_x, rect.height()),
+                        info_text, self.info_font_size, QtGui.QFont.Weight.Normal, colors["info_color"])
+
+        # Action buttons
+        self._draw_button(painter, edit_rect, self.config_static["paths"].get("edit_icon"), "✏️",
+                          colors["edit_button_background"], colors["edit_button_border"])
+        self._draw_button(painter, done_rect, self.config_static["paths"].get("delete_icon"), "✓",
+                          colors["done_button_background"], colors["done_button_border"])
+        painter.restore()
+
+    def _draw_pixmap(self, painter, rect, pixmap):
+        x = rect.left() + (rect.width() - pixmap.width()) // 2
+        y = rect.top() + (rect.height() - pixmap.height()) // 2
+        painter.drawPixmap(x, y, pixmap)
+
+    def _draw_text(self, painter, rect, text, pixel_size, weight, color,
+                   alignment=QtCore.Qt.AlignmentFlag.AlignLeft):
+        """Draw elided single-line text, returns the width used"""
+        if rect.width() <= 0:
+            return 0
+        font, metrics = self._font(painter, pixel_size, weight)
+        text = metrics.elidedText(text, QtCore.Qt.TextElideMode.ElideRight, rect.width())
+        painter.setFont(font)
+        painter.setPen(color)
+        painter.drawText(rect, alignment | QtCore.Qt.AlignmentFlag.AlignVCenter, text)
+        return min(rect.width(), metrics.horizontalAdvance(text))
+
+    def _font(self, painter, pixel_size, weight):
+        """(font, metrics) derived from the view font, built once per size and weight"""
+        key = (pixel_size, weight)
+        if key not in self._fonts:
+            font = QtGui.QFont(painter.font())
+            font.setPixelSize(pixel_size)
+            font.setWeight(weight)
+            self._fonts[key] = (font, QtGui.QFontMetrics(font))
+        return self._fonts[key]
+
+    def _draw_button(self, painter, rect, icon_path, fallback_text, bg_color, border_color):
+        painter.setPen(border_color)
+        painter.setBrush(bg_color)
+        painter.drawRoundedRect(QtCore.QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5), 4, 4)
+        pixmap = get_pixmap(icon_path, 16)
+        if pixmap is not None:
+            self._draw_pixmap(painter, rect, pixmap)
+        else:
+            self._draw_text(painter, rect, fallback_text, 12, QtGui.QFont.Weight.Normal, self.colors["icon_color"],
+                            QtCore.Qt.AlignmentFlag.AlignCenter)
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QtCore.QEvent.Type.MouseButtonRelease
+                and event.button() == QtCore.Qt.MouseButton.LeftButton):
+            row = index.data(ROW_ROLE)
+            if row is not None:
+                edit_rect, done_rect = self.button_rects(option.rect.adjusted(1, 1, -1, -1))
+                pos = event.position().toPoint()
+                if edit_rect.contains(pos):
+                    self.edit_requested.emit(row.reminder)
+                    return True
+                if done_rect.contains(pos):
+                    self.done_requested.emit(row.reminder)
+                    return True
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QtCore.QEvent.Type.ToolTip:
+            edit_rect, done_rect = self.button_rects(option.rect.adjusted(1, 1, -1, -1))
+            text = None
+            if edit_rect.contains(event.pos()):
+                text = self.tl_config["edit_tooltip"]
+            elif done_rect.contains(event.pos()):
+                text = self.tl_config["delete_tooltip"]
+            if text:
+                QtWidgets.QToolTip.showText(event.globalPos(), text, view)
+                return True
+        return super().helpEvent(event, view, option, index)
@@ -0,0 +1,366 @@
+import datetime
+import heapq
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+from agenda import iter_occurrences
+from reminder_check import CompiledReminder
+
+KNOWN_RECURRENCE_TYPES = ("once", "daily", "weekly", "monthly", "yearly")
+
+
+class MissedReminder(NamedTuple):
+    """A reminder whose occurrences passed while the scheduler was not running"""
+    reminder: Mapping[str, Any]
+    count: int
+    first: datetime.datetime
+    last: datetime.datetime
+
+
+class ReminderScheduler:
+    """
+    Min-heap of (next_fire_time, reminder_id) entries.
+
+    Only the earliest entry has to be looked at to know when to wake up, and
+    only reminders that are actually due are touched when it fires. Entries
+    are replaced lazily: rescheduling pushes a new entry and the old one is
+    skipped when it reaches the top of the heap.
+    """
+
+    def __init__(self, fallback_interval: datetime.timedelta = datetime.timedelta(seconds=10)):
+        # Reminders with an unknown recurrence type are always due; they are
+        # re-checked at this interval like the old polling loop did
+        self.fallback_interval = fallback_interval
+        self._heap: List[Tuple[datetime.datetime, int, Any]] = []
+        self._entries: Dict[Any, int] = {}  # reminder id -> sequence number of its live heap entry
+        self._known: Dict[Any, CompiledReminder] = {}  # compiled reminder the entry was computed from
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def schedule(self, compiled: CompiledReminder, after: datetime.datetime) -> Optional[datetime.datetime]:
+        """(Re)compute the next fire time of a reminder and put it on the heap"""
+        reminder_id = compiled.id
+        self._known[reminder_id] = compiled
+        if compiled.recurrence_type in KNOWN_RECURRENCE_TYPES:
+            fire_time = compiled.next_fire_time(after)
+        else:
+            fire_time = after + self.fallback_interval
+        if fire_time is None:
+            self._entries.pop(reminder_id, None)
+            return None
+        seq = next(self._counter)
+        self._entries[reminder_id] = seq
+        heapq.heappush(self._heap, (fire_time, seq, reminder_id))
+        self._compact()
+        return fire_time
+
+    def remove(self, reminder_id: Any) -> None:
+        """Forget a reminder; its heap entry becomes stale"""
+        self._entries.pop(reminder_id, None)
+        self._known.pop(reminder_id, None)
+
+    def sync(self, compiled_reminders, now: datetime.datetime) -> None:
+        """
+        Bring the heap in line with the current compiled reminders. The data manager
+        hands out a new compiled object only when the record or its last completion
+        changed, so only those are recomputed.
+        """
+        seen = set()
+        for compiled in compiled_reminders:
+            reminder_id = compiled.id
+            if reminder_id is None:
+                continue
+            seen.add(reminder_id)
+            if self._known.get(reminder_id) is compiled:
+                continue
+            self.schedule(compiled, now)
+        for reminder_id in [rid for rid in self._known if rid not in seen]:
+            self.remove(reminder_id)
+
+    def _drop_stale_head(self) -> None:
+        heap = self._heap
+        while heap and self._entries.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+
+    def _compact(self) -> None:
+        """Rebuild the heap when stale entries dominate it"""
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._entries):
+            self._heap = [item for item in self._heap if self._entries.get(item[2]) == item[1]]
+            heapq.heapify(self._heap)
+
+    def next_fire_time(self) -> Optional[datetime.datetime]:
+        """Earliest scheduled fire time, None if nothing is scheduled"""
+        self._drop_stale_head()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime.datetime) -> List[Any]:
+        """Remove and return ids of reminders due at now, earliest first"""
+        due = []
+        heap = self._heap
+        while True:
+            self._drop_stale_head()
+            if not heap or heap[0][0] > now:
+                break
+            _, _, reminder_id = heapq.heappop(heap)
+            del self._entries[reminder_id]
+            # Recomputed on the next sync, whatever the firing did to the data
+            self._known.pop(reminder_id, None)
+            due.append(reminder_id)
+        return due
+
+
+class ReminderEngine:
+    """
+    GUI-free scheduling path: keeps a ReminderScheduler in sync with the
+    DataManager, fires due reminders to its subscribers and marks them completed.
+
+    start() runs the loop on a worker thread that sleeps until the next deadline
+    (at most check_interval) and is woken up by data changes, so slow UI work on
+    the main thread never delays a reminder. Without start() the caller drives
+    run_due() itself (simulations with a fake clock) using next_delay().
+    Subscribers are called on the thread that fires: a GUI must hand the
+    reminder over to its own thread.
+    """
+
+    def __init__(self, data_manager, notify: Optional[Callable[[Mapping[str, Any]], None]] = None,
+                 check_interval: datetime.timedelta = datetime.timedelta(seconds=10), clock=None,
+                 heartbeat_interval: datetime.timedelta = datetime.timedelta(minutes=10)):
+        self.data_manager = data_manager
+        self.clock = clock or data_manager.clock
+        self.scheduler = ReminderScheduler(check_interval)
+        # How often the worker thread persists the "last run" heartbeat used by catch_up(),
+        # which rewrites config_dynamic.json; stop() always writes it. After a crash
+        # catch_up() starts each reminder at its last completion if that is newer, so
+        # reminders fired after the last saved heartbeat are not reported again
+        self.heartbeat_interval = heartbeat_interval
+        self._last_heartbeat: Optional[datetime.datetime] = None
+        self._subscribers: List[Callable[[Mapping[str, Any]], None]] = []
+        if notify is not None:
+            self._subscribers.append(notify)
+        self._synced_versions = None
+        self._firing = False
+        self._wake_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    @property
+    def check_interval(self) -> datetime.timedelta:
+        """Longest sleep between runs, also the retry interval of always-due reminders"""
+        return self.scheduler.fallback_interval
+
+    @check_interval.setter
+    def check_interval(self, value: datetime.timedelta) -> None:
+        self.scheduler.fallback_interval = value
+        self.wake()
+
+    def subscribe(self, callback: Callable[[Mapping[str, Any]], None]) -> None:
+        """Call callback(reminder) for every fired reminder"""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Mapping[str, Any]], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def notify(self, reminder: Mapping[str, Any]) -> None:
+        """Hand a fired reminder to every subscriber"""
+        for callback in list(self._subscribers):
+            try:
+                callback(reminder)
+            except Exception as e:
+                print(f"Error in reminder subscriber: {e}")
+
+    @staticmethod
+    def is_valid(reminder: Mapping[str, Any]) -> bool:
+        return "id" in reminder and "text" in reminder
+
+    def _versions(self) -> Tuple[int, int]:
+        return self.data_manager.get_version('reminders'), self.data_manager.get_version('completed')
+
+    def sync(self, now: Optional[datetime.datetime] = None) -> None:
+        """Reschedule reminders whose record or last completion changed since the last sync"""
+        versions = self._versions()
+        if self._firing or versions == self._synced_versions:
+            return
+        self._synced_versions = versions
+        compiled = (c for c in self.data_manager.get_compiled_reminders() if self.is_valid(c.source))
+        self.scheduler.sync(compiled, now or self.clock.now())
+
+    def next_deadline(self) -> Optional[datetime.datetime]:
+        """Earliest scheduled fire time, None if nothing is scheduled"""
+        return self.scheduler.next_fire_time()
+
+    def next_delay(self, now: Optional[datetime.datetime] = None) -> datetime.timedelta:
+        """How long to sleep before the next run_due(), capped by check_interval"""
+        now = now or self.clock.now()
+        deadline = self.next_deadline()
+        if deadline is None:
+            return self.check_interval
+        return max(datetime.timedelta(0), min(self.check_interval, deadline - now))
+
+    def should_fire(self, reminder: Mapping[str, Any], now: datetime.datetime) -> bool:
+        """Check if a reminder is due at now given its last completion"""
+        compiled = self.data_manager.get_compiled_reminder(reminder.get("id"))
+        return compiled is not None and compiled.is_due(now)
+
+    def mark_completed(self, reminder: Mapping[str, Any]) -> None:
+        """One-time reminders move to the backlog, recurring ones are marked completed"""
+        if not self.is_valid(reminder):
+            return
+        if reminder.get("recurrence_type") == "once":
+            with self.data_manager.transaction():
+                self.data_manager.add_to_backlog(reminder["text"])
+                self.data_manager.remove_reminder(reminder["id"])
+        else:
+            self.data_manager.add_completed_entry(reminder["id"])
+
+    def run_due(self, now: Optional[datetime.datetime] = None) -> List[Mapping[str, Any]]:
+        """Fire every reminder due at now and re-insert it; returns the fired reminders"""
+        now = now or self.clock.now()
+        fired = []
+        # One transaction per run: the completions are written once, and no other
+        # thread can change the data between marking and re-inserting
+        with self.data_manager.transaction():
+            self.sync(now)
+            self._firing = True
+            try:
+                for reminder_id in self.scheduler.pop_due(now):
+                    compiled = self.data_manager.get_compiled_reminder(reminder_id)
+                    if compiled is None or not self.is_valid(compiled.source):
+                        continue
+                    if compiled.is_due(now):
+                        self.mark_completed(compiled.source)
+                        fired.append(compiled.source)
+                    else:
+                        # Not due after all (e.g. completed meanwhile): look again after check_interval
+                        self.scheduler.schedule(compiled, now + self.check_interval)
+            finally:
+                self._firing = False
+            # Only our own completions happened meanwhile: re-insert the fired reminders
+            # instead of re-syncing everything
+            if fired and self._synced_versions is not None:
+                for reminder in fired:
+                    current = self.data_manager.get_compiled_reminder(reminder["id"])
+                    if current is None:
+                        self.scheduler.remove(reminder["id"])
+                    else:
+                        self.scheduler.schedule(current, now)
+                self._synced_versions = self._versions()
+        # Subscribers run outside the lock so a slow one cannot block data changes
+        for reminder in fired:
+            self.notify(reminder)
+        self.sync(now)
+        return fired
+
+    def catch_up(self, now: Optional[datetime.datetime] = None) -> List[MissedReminder]:
+        """
+        Handle occurrences missed while the scheduler was not running, before the
+        regular loop starts. One-time reminders that are overdue and recurring
+        occurrences between the last heartbeat and now are collected; one-time
+        reminders move to the backlog and recurring ones are marked completed at
+        their last missed occurrence, all in one transaction. Nothing is notified:
+        the caller presents the returned list at once, earliest first.
+        Without a heartbeat (first run) only one-time reminders are caught up.
+        """
+        now = now or self.clock.now()
+        missed = []
+        with self.data_manager.transaction():
+            last_run_at = self.data_manager.get_last_run_at()
+            for compiled in self.data_manager.get_compiled_reminders():
+                reminder = compiled.source
+                if not self.is_valid(reminder):
+                    continue
+                if compiled.recurrence_type == "once":
+                    if compiled.fire_at is None:
+                        if reminder.get("time") and reminder.get("date"):
+                            print(f"Warning: Invalid date/time for reminder {reminder['id']}, skipping.")
+                        continue
+                    if compiled.fire_at < now:
+                        missed.append(MissedReminder(reminder, 1, compiled.fire_at, compiled.fire_at))
+                        self.mark_completed(reminder)
+                    continue
+                if last_run_at is None or last_run_at >= now:
+                    continue
+                # A completion after the heartbeat is a newer heartbeat of this reminder:
+                # it fired (or was done) then, the heartbeat just was not saved since
+                since = last_run_at
+                if compiled.completed_epoch is not None and compiled.completed_epoch > since.timestamp():
+                    since = datetime.datetime.fromtimestamp(compiled.completed_epoch)
+                count, first, last = 0, None, None
+                for moment in iter_occurrences(compiled, since, now):
+                    count += 1
+                    first = first or moment
+                    last = moment
+                if not count:
+                    continue
+                missed.append(MissedReminder(reminder, count, first, last))
+                # Completing at the last missed occurrence closes its period only,
+                # later occurrences (e.g. today's) still fire normally
+                if compiled.completed_epoch is None or last.timestamp() > compiled.completed_epoch:
+                    self.data_manager.add_completed_entry(compiled.id, last)
+            self.data_manager.set_last_run_at(now)
+            self._last_heartbeat = now
+        missed.sort(key=lambda item: item.first)
+        return missed
+
+    def heartbeat(self, now: Optional[datetime.datetime] = None, force: bool = False) -> None:
+        """Persist that everything due before now was handled, at most once per heartbeat_interval"""
+        now = now or self.clock.now()
+        # Reminders scheduled before now that have not fired yet are not handled
+        deadline = self.next_deadline()
+        if deadline is not None and deadline < now:
+            now = deadline
+        if not force and self._last_heartbeat is not None and now - self._last_heartbeat < self.heartbeat_interval:
+            return
+        self.data_manager.set_last_run_at(now)
+        self._last_heartbeat = now
+
+    def wake(self, *_) -> None:
+        """Make the worker thread re-check now (data changed); accepts subscriber arguments"""
+        self._wake_event.set()
+
+    def start(self) -> None:
+        """Run the firing loop on a daemon worker thread"""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self.data_manager.subscribe('reminders', self.wake)
+        self.data_manager.subscribe('completed', self.wake)
+        self._thread = threading.Thread(target=self._run, name="ReminderEngine", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop the worker thread and wait for a run in progress to finish"""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self.data_manager.unsubscribe('reminders', self.wake)
+        self.data_manager.unsubscribe('completed', self.wake)
+        self.wake()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        try:
+            self.heartbeat(force=True)
+        except Exception as e:
+            print(f"Error saving scheduler heartbeat: {e}")
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def _run(self) -> None:
+        while not self._stopping:
+            # Cleared before the run: a change during the run keeps the event set
+            self._wake_event.clear()
+            try:
+                now = self.clock.now()
+                self.run_due(now)
+                self.heartbeat(now)
+                delay = self.next_delay()
+            except Exception as e:
+                print(f"Error checking reminders: {e}")
+                delay = self.check_interval
+            self._wake_event.wait(delay.total_seconds())
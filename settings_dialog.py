@@ -1,21 +1,24 @@
-import winreg
 import sys
 import os
 import datetime
 from PyQt6 import QtWidgets, QtGui
+from utils import save_json
+from icon_cache import get_icon
 
 class SettingsDialog(QtWidgets.QDialog):
-    def __init__(self, config_static, config_dynamic, parent, toggle_auto_run_callback, icon_path=None):
+    def __init__(self, config_static, config_dynamic, parent, toggle_auto_run_callback, icon_path=None, data_manager=None):
         super().__init__(parent)
         self.config_static = config_static
         self.config_dynamic = config_dynamic
+        self.data_manager = data_manager
         self.parent = parent
         self.toggle_auto_run_callback = toggle_auto_run_callback
         self.setWindowTitle(self.config_static["settings_dialog"]["window_title"])
 
         # Set window icon if provided
-        if icon_path and os.path.exists(icon_path):
-            self.setWindowIcon(QtGui.QIcon(icon_path))
+        icon = get_icon(icon_path)
+        if icon is not None:
+            self.setWindowIcon(icon)
 
         # Apply dark theme styling with f-string to avoid .format() issues
         arrow_up_path = os.path.join(os.path.abspath("icons"), "arrow-up-white.svg").replace("\\", "/")
@@ -107,7 +110,6 @@ class SettingsDialog(QtWidgets.QDialog):
 
         # Auto-start checkbox
         self.auto_run_checkbox = QtWidgets.QCheckBox(self.config_static["settings_dialog"]["autostart_label"])
-        self.auto_run_checkbox.setChecked(self.is_auto_start_enabled())
         self.auto_run_checkbox.stateChanged.connect(self.toggle_auto_run)
         layout.addWidget(self.auto_run_checkbox)
 
@@ -121,7 +123,6 @@ class SettingsDialog(QtWidgets.QDialog):
         self.interval_spinbox = QtWidgets.QSpinBox()
         self.interval_spinbox.setRange(5, 3600)
         self.interval_spinbox.setSuffix(" sec")
-        self.interval_spinbox.setValue(self.config_dynamic["settings_dialog"]["reminder_check_interval_sec"])
         layout.addWidget(self.interval_spinbox)
 
         # Spacing before buttons
@@ -143,10 +144,22 @@ class SettingsDialog(QtWidgets.QDialog):
 
         self.setLayout(layout)
         self.setFixedSize(self.sizeHint())
+        self.reset()
+
+    def reset(self, config_dynamic=None):
+        """Load the current settings into the inputs (the dialog is reused)"""
+        if config_dynamic is not None:
+            self.config_dynamic = config_dynamic
+        # Reflect the registry without writing it back
+        self.auto_run_checkbox.blockSignals(True)
+        self.auto_run_checkbox.setChecked(self.is_auto_start_enabled())
+        self.auto_run_checkbox.blockSignals(False)
+        self.interval_spinbox.setValue(self.config_dynamic["settings_dialog"]["reminder_check_interval_sec"])
 
     def is_auto_start_enabled(self):
         """Check if auto-start is currently enabled in Windows registry"""
         try:
+            import winreg  # Windows only
             key = r"Software\Microsoft\Windows\CurrentVersion\Run"
             with winreg.OpenKey(winreg.HKEY_CURRENT_USER, key, 0, winreg.KEY_READ) as reg_key:
                 value, _ = winreg.QueryValueEx(reg_key, "NotifyApp")
@@ -157,6 +170,7 @@ class SettingsDialog(QtWidgets.QDialog):
     def enable_autostart(self, exe_path):
         """Enable autostart in Windows registry"""
         try:
+            import winreg  # Windows only
             bat_path = os.path.join(os.path.dirname(exe_path), "start.bat")
             full_path = f'"{bat_path}"'
             key = r"Software\Microsoft\Windows\CurrentVersion\Run"
@@ -168,6 +182,7 @@ class SettingsDialog(QtWidgets.QDialog):
     def disable_autostart(self):
         """Disable autostart in Windows registry"""
         try:
+            import winreg  # Windows only
             key = r"Software\Microsoft\Windows\CurrentVersion\Run"
             with winreg.OpenKey(winreg.HKEY_CURRENT_USER, key, 0, winreg.KEY_SET_VALUE) as reg:
                 winreg.DeleteValue(reg, "NotifyApp")
@@ -237,8 +252,10 @@ class SettingsDialog(QtWidgets.QDialog):
             "width": size.width(),
             "height": size.height()
         }
-        from utils import save_json
-        save_json("config_dynamic.json", self.config_dynamic)
+        if self.data_manager:
+            self.data_manager.update_config_dynamic(self.config_dynamic)
+        else:
+            save_json("config_dynamic.json", self.config_dynamic)
 
     def closeEvent(self, event):
         self.save_position()
@@ -252,7 +269,8 @@ class SettingsDialog(QtWidgets.QDialog):
             QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No
         )
         if reply == QtWidgets.QMessageBox.StandardButton.Yes:
-            import json
-            with open(self.config_static["paths"]["backlog_path"], "w", encoding="utf-8") as f:
-                json.dump([], f, indent=4, ensure_ascii=False)
+            if self.data_manager:
+                self.data_manager.update_backlog([])
+            else:
+                save_json(self.config_static["paths"]["backlog_path"], [])
             QtWidgets.QMessageBox.information(self, "Backlog Cleared", "Backlog has been cleared.")
\ No newline at end of file
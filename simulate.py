@@ -0,0 +1,186 @@
+"""
+Headless time-travel simulation of the reminder scheduling path.
+
+Replays a period (a year by default) against a synthetic reminder set with a
+fake clock and in-memory storage, driving ReminderEngine.run_due() the way its
+worker thread does, and compares the fires with the expected schedule:
+
+    python simulate.py --reminders 1000 --days 365
+    python simulate.py --mode poll --interval 10
+"""
+import argparse
+import datetime
+import random
+import time
+from typing import Any, Dict, List, Optional
+from agenda import iter_occurrences
+from clock import FakeClock
+from data_manager import DataManager
+from reminder_check import CompiledReminder
+from scheduler import ReminderEngine
+
+SIMULATION_CONFIG = {
+    "paths": {
+        "notify_path": "simulation-notify.json",
+        "backlog_path": "simulation-backlog.json",
+        "completed_path": "simulation-completed.json",
+    },
+    "storage": {"backend": "memory", "write_behind": False},
+    "history": {"enabled": False},
+}
+
+RECURRENCE_TYPES = ("once", "daily", "weekly", "monthly", "yearly")
+
+
+def synthetic_reminders(count: int, start: datetime.datetime, days: int = 365, seed: int = 0) -> List[Dict[str, Any]]:
+    """Random mix of all recurrence types; one-time reminders fall inside the simulated period"""
+    rng = random.Random(seed)
+    reminders = []
+    for i in range(count):
+        recurrence_type = rng.choice(RECURRENCE_TYPES)
+        reminder = {
+            "id": f"sim-{i}",
+            "text": f"Reminder {i}",
+            "time": f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+            "recurrence_type": recurrence_type,
+            "recurring": recurrence_type != "once",
+        }
+        if recurrence_type == "once":
+            reminder["date"] = (start + datetime.timedelta(days=rng.randrange(days))).strftime("%Y-%m-%d")
+        elif recurrence_type == "weekly":
+            reminder["weekly_days"] = sorted(rng.sample(range(7), rng.randrange(1, 4)))
+        elif recurrence_type == "monthly":
+            reminder["monthly_day"] = rng.randrange(1, 32)
+        elif recurrence_type == "yearly":
+            reminder["yearly_month"] = rng.randrange(1, 13)
+            reminder["yearly_day"] = rng.randrange(1, 32)
+        reminders.append(reminder)
+    return reminders
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def simulate(reminders: List[Dict[str, Any]], start: datetime.datetime, days: int = 365,
+             check_interval_sec: float = 10, mode: str = "heap", timer_latency_sec: float = 0.0) -> Dict[str, Any]:
+    """
+    Run the scheduling path from start for days.
+
+    mode "heap" wakes up exactly at the earliest deadline (the engine's worker
+    thread); mode "poll" wakes up on a fixed check_interval_sec grid like the old
+    polling timer. timer_latency_sec delays every wake-up.
+    Idle safety wake-ups (every check_interval_sec when nothing is due) cannot
+    change the outcome with a fake clock, so they are counted but not executed.
+    """
+    clock = FakeClock(start)
+    end = start + datetime.timedelta(days=days)
+    interval = datetime.timedelta(seconds=check_interval_sec)
+    latency = datetime.timedelta(seconds=timer_latency_sec)
+
+    fires: Dict[Any, List[datetime.datetime]] = {}
+
+    def record_fire(reminder):
+        fires.setdefault(reminder["id"], []).append(clock.now())
+
+    data_manager = DataManager(SIMULATION_CONFIG, clock=clock)
+    data_manager.update_reminders(reminders)
+    engine = ReminderEngine(data_manager, record_fire, interval, clock)
+    expected = {compiled.id: list(iter_occurrences(compiled, start, end))
+                for compiled in (CompiledReminder(reminder) for reminder in reminders)}
+
+    wakeups = idle_wakeups = 0
+    wall_start = time.perf_counter()
+    engine.sync(start)
+    while True:
+        now = clock.now()
+        deadline = engine.next_deadline()
+        if deadline is None:
+            break
+        if mode == "poll":
+            ticks = -((start - max(deadline, now)) // interval)  # ceil
+            wake = start + max(ticks, 1) * interval
+        else:
+            wake = max(deadline, now)
+        wake += latency
+        if wake >= end:
+            break
+        # Wake-ups the timer would also make without anything due: safety caps or empty grid ticks
+        idle_wakeups += max(0, int((wake - latency - now) / interval) - (mode == "poll"))
+        clock.set(wake)
+        wakeups += 1
+        engine.run_due(wake)
+    wall_time = time.perf_counter() - wall_start
+    data_manager.close()
+
+    # Match every expected occurrence with the first fire before the next occurrence
+    lateness: List[float] = []
+    missed = extra = 0
+    for reminder_id, occurrences in expected.items():
+        actual = fires.get(reminder_id, [])
+        position = 0
+        for index, occurrence in enumerate(occurrences):
+            until: Optional[datetime.datetime] = occurrences[index + 1] if index + 1 < len(occurrences) else end
+            while position < len(actual) and actual[position] < occurrence:
+                extra += 1
+                position += 1
+            if position < len(actual) and actual[position] < until:
+                lateness.append((actual[position] - occurrence).total_seconds())
+                position += 1
+            else:
+                missed += 1
+        extra += len(actual) - position
+    lateness.sort()
+
+    return {
+        "mode": mode,
+        "reminders": len(reminders),
+        "days": days,
+        "expected": sum(len(occurrences) for occurrences in expected.values()),
+        "fires": sum(len(actual) for actual in fires.values()),
+        "missed": missed,
+        "extra": extra,
+        "lateness_mean_sec": sum(lateness) / len(lateness) if lateness else 0.0,
+        "lateness_p99_sec": _percentile(lateness, 0.99),
+        "lateness_max_sec": lateness[-1] if lateness else 0.0,
+        "wakeups": wakeups,
+        "idle_wakeups": idle_wakeups,
+        "wall_time_sec": wall_time,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    return "\n".join([
+        f"Mode:            {report['mode']}",
+        f"Reminders:       {report['reminders']} over {report['days']} days",
+        f"Expected fires:  {report['expected']}",
+        f"Fires:           {report['fires']}",
+        f"Missed fires:    {report['missed']}",
+        f"Extra fires:     {report['extra']}",
+        f"Lateness:        mean {report['lateness_mean_sec']:.2f} s, p99 {report['lateness_p99_sec']:.2f} s, "
+        f"max {report['lateness_max_sec']:.2f} s",
+        f"Wake-ups:        {report['wakeups']} (+{report['idle_wakeups']} idle safety wake-ups)",
+        f"Wall time:       {report['wall_time_sec']:.2f} s",
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay reminder scheduling with a fake clock")
+    parser.add_argument("--reminders", type=int, default=1000, help="number of synthetic reminders")
+    parser.add_argument("--days", type=int, default=365, help="simulated period in days")
+    parser.add_argument("--start", default="2026-01-01T00:00:00", help="simulation start (ISO format)")
+    parser.add_argument("--interval", type=float, default=10, help="reminder_check_interval_sec")
+    parser.add_argument("--mode", choices=("heap", "poll"), default="heap", help="wake-up strategy")
+    parser.add_argument("--latency", type=float, default=0.0, help="timer latency added to every wake-up (sec)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the reminder set")
+    args = parser.parse_args()
+
+    start = datetime.datetime.fromisoformat(args.start)
+    reminders = synthetic_reminders(args.reminders, start, args.days, args.seed)
+    print(format_report(simulate(reminders, start, args.days, args.interval, args.mode, args.latency)))
+
+
+if __name__ == "__main__":
+    main()
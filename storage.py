@@ -0,0 +1,392 @@
+import copy
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Any, Optional
+from datetime import datetime
+from utils import load_json, repair_torn_line, save_json
+from reminder_check import ReminderChecker
+from clock import SystemClock
+
+
+def apply_op(data: List[Dict[str, Any]], op: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Apply a single mutation record to a list of records"""
+    kind = op.get("op")
+    if kind == "replace":
+        return list(op.get("data", []))
+    if kind == "append":
+        data.append(op["record"])
+    elif kind == "upsert":
+        for i, item in enumerate(data):
+            if item.get("id") == op["id"]:
+                data[i] = op["record"]
+                break
+        else:
+            data.append(op["record"])
+    elif kind == "remove":
+        data = [item for item in data if item.get("id") != op["id"]]
+    return data
+
+
+class JsonStorage:
+    """
+    Default storage: every write rewrites the whole JSON file
+    """
+
+    def __init__(self, file_paths: Dict[str, str], storage_config: Optional[Dict[str, Any]] = None,
+                 clock: Optional[SystemClock] = None):
+        self.file_paths = file_paths
+        self.storage_config = storage_config or {}
+        self.clock = clock or SystemClock()
+        self.json_format = self.storage_config.get("json_format", "pretty")
+
+    def load(self, key: str) -> Any:
+        """Load data for key"""
+        return load_json(self.file_paths[key], [])
+
+    def write(self, key: str, data: Any, ops: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Persist data for key. ops describe the mutations since the last write"""
+        save_json(self.file_paths[key], data, self.json_format)
+
+    def paths(self, key: str) -> List[str]:
+        """Files holding the data of key"""
+        return [self.file_paths[key]]
+
+    def close(self) -> None:
+        """Release resources"""
+        pass
+
+
+class JournalStorage(JsonStorage):
+    """
+    Append-only journal storage: mutations are appended as small records to
+    <file>.journal and periodically folded into the snapshot JSON file
+    """
+
+    JOURNAL_KEYS = ('reminders', 'backlog', 'completed')
+
+    def __init__(self, file_paths: Dict[str, str], storage_config: Optional[Dict[str, Any]] = None,
+                 clock: Optional[SystemClock] = None):
+        super().__init__(file_paths, storage_config, clock)
+        self._lock = threading.Lock()
+        self._journal_sizes: Dict[str, int] = {key: 0 for key in self.JOURNAL_KEYS}
+        self._journal_repaired = set()  # Journals checked for a torn last line since startup
+        self._compact_threshold = self.storage_config.get("journal_compact_threshold", 500)
+        self._compact_interval = self.storage_config.get("journal_compact_interval_sec", 300)
+        self._compact_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._compactor = threading.Thread(target=self._compaction_loop, name="journal-compactor", daemon=True)
+        self._compactor.start()
+
+    def _journal_path(self, key: str) -> str:
+        return self.file_paths[key] + ".journal"
+
+    def _read_journal(self, key: str) -> List[Dict[str, Any]]:
+        """Read journal records, skipping a torn last line"""
+        ops = []
+        try:
+            with open(self._journal_path(key), 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        ops.append(json.loads(line))
+                    except ValueError:
+                        print(f"Warning: skipping damaged journal record in {self._journal_path(key)}")
+        except FileNotFoundError:
+            pass
+        return ops
+
+    def load(self, key: str) -> Any:
+        """Load snapshot and replay the journal tail"""
+        if key not in self.JOURNAL_KEYS:
+            return super().load(key)
+        # Snapshot and journal are read together, compact() rewrites both under the same lock
+        with self._lock:
+            data = super().load(key)
+            ops = self._read_journal(key)
+            self._journal_sizes[key] = len(ops)
+        for op in ops:
+            data = apply_op(data, op)
+        return data
+
+    def write(self, key: str, data: Any, ops: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Append mutation records, or rewrite the snapshot when no records are given"""
+        if key not in self.JOURNAL_KEYS or ops is None:
+            with self._lock:
+                super().write(key, data)
+                if key in self.JOURNAL_KEYS:
+                    self._truncate_journal(key)
+            return
+
+        if not ops:
+            return
+        lines = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops)
+        with self._lock:
+            if key not in self._journal_repaired:
+                # A crash may have left a partial line; appending to it would lose these records
+                repair_torn_line(self._journal_path(key))
+                self._journal_repaired.add(key)
+            with open(self._journal_path(key), 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_sizes[key] += len(ops)
+            if self._journal_sizes[key] >= self._compact_threshold:
+                self._compact_event.set()
+
+    def paths(self, key: str) -> List[str]:
+        """Snapshot file plus its journal"""
+        if key not in self.JOURNAL_KEYS:
+            return super().paths(key)
+        return [self.file_paths[key], self._journal_path(key)]
+
+    def _truncate_journal(self, key: str) -> None:
+        try:
+            os.remove(self._journal_path(key))
+        except FileNotFoundError:
+            pass
+        self._journal_sizes[key] = 0
+
+    def compact(self, key: Optional[str] = None) -> None:
+        """Fold journal records into the snapshot file"""
+        keys = [key] if key else self.JOURNAL_KEYS
+        for k in keys:
+            with self._lock:
+                if not self._journal_sizes.get(k):
+                    continue
+                data = super().load(k)
+                for op in self._read_journal(k):
+                    data = apply_op(data, op)
+                super().write(k, data)
+                self._truncate_journal(k)
+
+    def _compaction_loop(self) -> None:
+        while not self._stop_event.is_set():
+            self._compact_event.wait(self._compact_interval)
+            self._compact_event.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Error compacting journal: {e}")
+
+    def close(self) -> None:
+        """Stop the compactor and fold the remaining journal"""
+        self._stop_event.set()
+        self._compact_event.set()
+        self._compactor.join(timeout=5)
+        self.compact()
+
+
+class SqliteStorage(JsonStorage):
+    """
+    SQLite storage: reminders, backlog and completed entries live in one local
+    database and single-record mutations touch only their own row.
+    config_dynamic stays in its JSON file.
+    """
+
+    TABLE_KEYS = ('reminders', 'backlog', 'completed')
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS reminders (
+            id TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            recurrence_type TEXT,
+            next_fire_at TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_reminders_recurrence_type ON reminders (recurrence_type);
+        CREATE INDEX IF NOT EXISTS idx_reminders_next_fire_at ON reminders (next_fire_at);
+        CREATE INDEX IF NOT EXISTS idx_reminders_position ON reminders (position);
+        CREATE TABLE IF NOT EXISTS completed (
+            id TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            completed_at TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_completed_position ON completed (position);
+        CREATE TABLE IF NOT EXISTS backlog (
+            position INTEGER PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, file_paths: Dict[str, str], storage_config: Optional[Dict[str, Any]] = None,
+                 clock: Optional[SystemClock] = None):
+        super().__init__(file_paths, storage_config, clock)
+        self.db_path = self.storage_config.get("sqlite_path", "notify.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._migrate_from_json()
+
+    def _migrate_from_json(self) -> None:
+        """One-shot import of the existing JSON files into an empty database"""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'migrated_from_json'").fetchone()
+            if row:
+                return
+            for key in self.TABLE_KEYS:
+                self._replace_all(key, super().load(key))
+            self._refresh_next_fire()
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from_json', '1')")
+
+    def _columns(self, key: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Indexed columns stored next to the JSON payload"""
+        columns = {"data": json.dumps(record, ensure_ascii=False)}
+        if key == 'reminders':
+            columns["id"] = record.get("id")
+            columns["recurrence_type"] = record.get("recurrence_type")
+            columns["next_fire_at"] = next_fire_at(record, self.clock.now(), self._completed_at(record.get("id")))
+        elif key == 'completed':
+            columns["id"] = record.get("id")
+            columns["completed_at"] = record.get("completed_at")
+        return columns
+
+    def _completed_at(self, reminder_id: Any) -> Optional[str]:
+        row = self._conn.execute("SELECT completed_at FROM completed WHERE id = ?", (reminder_id,)).fetchone()
+        return row[0] if row else None
+
+    def _refresh_next_fire(self, reminder_ids: Optional[List[Any]] = None) -> None:
+        """Recompute next_fire_at after completions changed (all reminders if ids is None)"""
+        if reminder_ids is None:
+            rows = self._conn.execute("SELECT id, data FROM reminders").fetchall()
+        else:
+            rows = []
+            for reminder_id in set(reminder_ids):
+                rows += self._conn.execute("SELECT id, data FROM reminders WHERE id = ?", (reminder_id,)).fetchall()
+        now = self.clock.now()
+        updates = [(next_fire_at(json.loads(data), now, self._completed_at(reminder_id)), reminder_id)
+                   for reminder_id, data in rows]
+        self._conn.executemany("UPDATE reminders SET next_fire_at = ? WHERE id = ?", updates)
+
+    def _insert(self, key: str, record: Dict[str, Any], position: Optional[int] = None) -> None:
+        columns = self._columns(key, record)
+        if position is None:
+            row = self._conn.execute(f"SELECT COALESCE(MAX(position), -1) + 1 FROM {key}").fetchone()
+            position = row[0]
+        columns["position"] = position
+        names = ", ".join(columns)
+        placeholders = ", ".join("?" for _ in columns)
+        self._conn.execute(f"INSERT OR REPLACE INTO {key} ({names}) VALUES ({placeholders})", list(columns.values()))
+
+    def _replace_all(self, key: str, data: List[Dict[str, Any]]) -> None:
+        self._conn.execute(f"DELETE FROM {key}")
+        for position, record in enumerate(data):
+            self._insert(key, record, position)
+
+    def _apply(self, key: str, op: Dict[str, Any]) -> None:
+        kind = op.get("op")
+        if kind == "replace":
+            self._replace_all(key, op.get("data", []))
+        elif kind == "append":
+            if key != 'backlog' and op["record"].get("id") is not None:
+                self._conn.execute(f"DELETE FROM {key} WHERE id = ?", (op["record"]["id"],))
+            self._insert(key, op["record"])
+        elif kind == "upsert":
+            columns = self._columns(key, op["record"])
+            assignments = ", ".join(f"{name} = ?" for name in columns)
+            cursor = self._conn.execute(f"UPDATE {key} SET {assignments} WHERE id = ?",
+                                        list(columns.values()) + [op["id"]])
+            if cursor.rowcount == 0:
+                self._insert(key, op["record"])
+        elif kind == "remove":
+            self._conn.execute(f"DELETE FROM {key} WHERE id = ?", (op["id"],))
+
+    def load(self, key: str) -> Any:
+        """Load records for key in their list order"""
+        if key not in self.TABLE_KEYS:
+            return super().load(key)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT data FROM {key} ORDER BY position").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def write(self, key: str, data: Any, ops: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Apply mutation records in one transaction, or replace the table when no records are given"""
+        if key not in self.TABLE_KEYS:
+            super().write(key, data)
+            return
+        with self._lock, self._conn:
+            if ops is None:
+                self._replace_all(key, data)
+            else:
+                for op in ops:
+                    self._apply(key, op)
+            if key == 'completed':
+                # The next fire time of a reminder depends on its last completion
+                if ops is None or any(op.get("op") == "replace" for op in ops):
+                    self._refresh_next_fire()
+                else:
+                    self._refresh_next_fire([op["record"].get("id") if "record" in op else op.get("id") for op in ops])
+
+    def paths(self, key: str) -> List[str]:
+        """Database file and its write-ahead log"""
+        if key not in self.TABLE_KEYS:
+            return super().paths(key)
+        return [self.db_path, self.db_path + "-wal"]
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class MemoryStorage(JsonStorage):
+    """
+    Volatile in-memory storage for simulations and headless runs: nothing touches
+    the disk. Starts empty
+    """
+
+    def __init__(self, file_paths: Dict[str, str], storage_config: Optional[Dict[str, Any]] = None,
+                 clock: Optional[SystemClock] = None):
+        super().__init__(file_paths, storage_config, clock)
+        self._data: Dict[str, Any] = {}
+
+    def load(self, key: str) -> Any:
+        """Last written data for key"""
+        if key not in self._data:
+            return {} if key == 'config_dynamic' else []
+        return copy.deepcopy(self._data[key])
+
+    def write(self, key: str, data: Any, ops: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Keep a copy of data. Records in lists are never changed in place, a shallow copy is enough"""
+        self._data[key] = list(data) if isinstance(data, list) else copy.deepcopy(data)
+
+    def paths(self, key: str) -> List[str]:
+        """No files"""
+        return []
+
+
+def next_fire_at(reminder: Dict[str, Any], now: datetime, last_completed_at: Optional[str] = None) -> Optional[str]:
+    """Next fire time as of the write, stored in the indexed next_fire_at column"""
+    fire_time = ReminderChecker.next_fire_time(reminder, now.replace(second=0, microsecond=0), last_completed_at)
+    return fire_time.isoformat() if fire_time else None
+
+
+STORAGE_BACKENDS = {
+    'json': JsonStorage,
+    'journal': JournalStorage,
+    'sqlite': SqliteStorage,
+    'memory': MemoryStorage,
+}
+
+
+def create_storage(file_paths: Dict[str, str], storage_config: Optional[Dict[str, Any]] = None,
+                   clock: Optional[SystemClock] = None) -> JsonStorage:
+    """Create storage backend selected by config_static["storage"]["backend"]"""
+    storage_config = storage_config or {}
+    backend = storage_config.get("backend", "json")
+    if backend not in STORAGE_BACKENDS:
+        print(f"Warning: Unknown storage backend '{backend}', using json")
+        backend = "json"
+    return STORAGE_BACKENDS[backend](file_paths, storage_config, clock)
@@ -0,0 +1,110 @@
+import datetime
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_checker
+from bulk_checker import BulkReminderChecker
+from reminder_check import CompiledReminder, ReminderChecker
+
+NOW_SAMPLES = [
+    datetime.datetime(2024, 2, 29, 12, 0),
+    datetime.datetime(2024, 3, 31, 23, 59, 59),
+    datetime.datetime(2025, 1, 1, 0, 0),
+    datetime.datetime(2025, 2, 28, 9, 0),
+    datetime.datetime(2025, 6, 30, 8, 59, 30),
+    datetime.datetime(2025, 12, 29, 18, 45),  # Monday
+]
+
+
+MALFORMED_VALUES = [None, "", "15", 0, -3, 40, 2 ** 40, 1.5, [1], "x"]
+MALFORMED_TIMES = [None, "", "25:00", "12:75", "-1:30", "9:5", "xx", "12"]
+MALFORMED_WEEKDAYS = [None, [], [7], [-1, 2], ["1"], [1.5, 3]]
+
+
+def random_value(rng, valid, malformed=MALFORMED_VALUES):
+    """A valid value most of the time, otherwise something a hand-edited file could contain"""
+    if rng.random() < 0.85:
+        return valid
+    return rng.choice(malformed)
+
+
+def random_reminder(rng, index):
+    recurrence_type = rng.choice(["once", "daily", "weekly", "monthly", "yearly", "daily", "hourly", None])
+    reminder = {"id": f"r{index}", "text": "t", "recurrence_type": recurrence_type,
+                "time": random_value(rng, f"{rng.randint(0, 23):02d}:{rng.choice([0, 30, 59, rng.randint(0, 59)]):02d}",
+                                     MALFORMED_TIMES)}
+    if recurrence_type == "once" or rng.random() < 0.1:
+        day = datetime.date(2024, 1, 1) + datetime.timedelta(days=rng.randint(0, 730))
+        reminder["date"] = random_value(rng, day.isoformat())
+    if recurrence_type == "weekly":
+        reminder["weekly_days"] = random_value(rng, sorted(rng.sample(range(7), rng.randint(0, 3))),
+                                                 MALFORMED_WEEKDAYS)
+    elif recurrence_type == "monthly":
+        reminder["monthly_day"] = random_value(rng, rng.choice([1, 28, 29, 30, 31, rng.randint(1, 31)]))
+    elif recurrence_type == "yearly":
+        reminder["yearly_month"] = random_value(rng, rng.randint(1, 12))
+        reminder["yearly_day"] = random_value(rng, rng.choice([1, 28, 29, 31, rng.randint(1, 31)]))
+    return reminder
+
+
+def random_completion(rng, now):
+    if rng.random() < 0.4:
+        return None
+    if rng.random() < 0.05:
+        return "not a date"
+    moment = now + datetime.timedelta(days=rng.choice([-400, -40, -7, -1, 0, 0]), minutes=rng.randint(-600, 600))
+    return moment.isoformat()
+
+
+def expected_due(reminder, now, completed_at):
+    """ReminderChecker.is_due; malformed values that make it raise never fire"""
+    try:
+        return bool(ReminderChecker.is_due(reminder, now, completed_at))
+    except Exception:
+        return False
+
+
+class BulkReminderCheckerTest(unittest.TestCase):
+    """Both evaluation paths must agree with ReminderChecker.is_due row by row"""
+
+    BATCHES = 20
+    BATCH_SIZE = 500
+
+    def check_batches(self, use_numpy):
+        rng = random.Random(1515)
+        for _ in range(self.BATCHES):
+            now = rng.choice(NOW_SAMPLES) + datetime.timedelta(days=rng.choice([0, 0, 1, 17, 200]),
+                                                                 minutes=rng.randint(-90, 90))
+            records = []
+            for index in range(self.BATCH_SIZE):
+                reminder = random_reminder(rng, index)
+                records.append((reminder, random_completion(rng, now)))
+            compiled = [CompiledReminder(reminder, {"completed_at": completed_at} if completed_at else None)
+                        for reminder, completed_at in records]
+            checker = BulkReminderChecker(compiled, use_numpy=use_numpy)
+            self.assertEqual(checker.use_numpy, use_numpy)
+            mask = [bool(due) for due in checker.due_mask(now)]
+            expected = [expected_due(reminder, now, completed_at) for reminder, completed_at in records]
+            for row, (due, want) in enumerate(zip(mask, expected)):
+                self.assertEqual(due, want, f"{records[row]} now={now}")
+            self.assertEqual(checker.due_ids(now), [c.id for c, due in zip(compiled, expected) if due])
+
+    def test_pure_python(self):
+        self.check_batches(use_numpy=False)
+
+    @unittest.skipIf(bulk_checker.np is None, "NumPy is not installed")
+    def test_numpy(self):
+        self.check_batches(use_numpy=True)
+
+    def test_empty(self):
+        checker = BulkReminderChecker([], use_numpy=False)
+        self.assertEqual(len(checker), 0)
+        self.assertEqual(checker.due_ids(NOW_SAMPLES[0]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
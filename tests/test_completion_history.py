@@ -0,0 +1,54 @@
+import contextlib
+import datetime
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock import FakeClock
+from completion_history import CompletionHistory
+
+
+class CompletionHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.clock = FakeClock(datetime.datetime(2025, 1, 15, 9, 0))
+
+    def open_history(self, retention_months=12):
+        return CompletionHistory(self.directory.name, retention_months, self.clock)
+
+    def test_append_after_torn_line_is_kept(self):
+        history = self.open_history()
+        history.record("a", datetime.datetime(2025, 1, 15, 9, 0), "daily")
+        history.flush()
+        with open(history._partition_path("2025-01"), 'a', encoding='utf-8') as f:
+            f.write('{"id": "a", "completed_at": "2025-01-1')
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            history = self.open_history()
+        history.record("b", datetime.datetime(2025, 1, 16, 9, 0), "daily")
+        self.assertEqual([record["id"] for record in history.iter_records()], ["a", "b"])
+        # Rollups rebuilt from the log after a crash (no flush) see both records
+        history = self.open_history()
+        self.assertEqual(history.get_rollup("a")["count"], 1)
+        self.assertEqual(history.get_rollup("b")["count"], 1)
+
+    def test_retention_follows_the_clock(self):
+        history = self.open_history(retention_months=2)
+        history.record("a", datetime.datetime(2025, 1, 15, 9, 0))
+        self.clock.set(datetime.datetime(2025, 3, 20, 9, 0))
+        history.record("a", datetime.datetime(2025, 3, 20, 9, 0))
+        self.assertEqual(history._partitions(), ["2025-01", "2025-03"])
+        # A long-running instance drops expired partitions when the month rolls over
+        self.clock.set(datetime.datetime(2025, 4, 1, 0, 0))
+        history.record("a", datetime.datetime(2025, 4, 1, 0, 0))
+        self.assertEqual(history._partitions(), ["2025-03", "2025-04"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_manager import DataManager
+from storage import JsonStorage
+
+
+class FailingStorage(JsonStorage):
+    """JSON storage whose writes raise while failures remain"""
+
+    def __init__(self, file_paths, failures=0):
+        super().__init__(file_paths)
+        self.failures = failures
+
+    def write(self, key, data, ops=None):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        super().write(key, data, ops)
+
+
+def reminder(reminder_id):
+    return {"id": reminder_id, "text": reminder_id, "time": "09:00", "recurrence_type": "daily",
+            "recurring": True}
+
+
+class DataManagerTestCase(unittest.TestCase):
+    """Runs in a temporary directory, config_dynamic.json is opened relative to it"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        self.addCleanup(os.chdir, cwd)
+
+    def make_config(self, backend="json", write_behind=False):
+        return {
+            "paths": {"notify_path": "notify.json", "backlog_path": "backlog.json",
+                      "completed_path": "completed.json"},
+            # Long delays: only explicit flushes write, the flush thread never races the test
+            "storage": {"backend": backend, "write_behind": write_behind, "flush_delay_sec": 3600,
+                        "max_staleness_sec": 3600, "journal_compact_interval_sec": 3600,
+                        "sqlite_path": "notify.db"},
+        }
+
+    def open_manager(self, **kwargs):
+        data_manager = DataManager(self.make_config(**kwargs))
+        self.addCleanup(data_manager.close)
+        return data_manager
+
+    def stored_ids(self, **kwargs):
+        return [record["id"] for record in self.open_manager(**kwargs).get_reminders()]
+
+
+class WriteBehindTest(DataManagerTestCase):
+
+    def fail_writes(self, data_manager, failures):
+        data_manager._storage = FailingStorage(data_manager._file_paths, failures)
+
+    def test_failed_flush_is_requeued(self):
+        data_manager = self.open_manager(write_behind=True)
+        self.fail_writes(data_manager, 1)
+        data_manager.add_reminder(reminder("a"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            data_manager.flush()
+        self.assertTrue(data_manager.is_dirty("reminders"))
+        self.assertEqual(self.stored_ids(), [])
+
+        data_manager.add_reminder(reminder("b"))
+        data_manager.flush()
+        self.assertFalse(data_manager.is_dirty("reminders"))
+        self.assertEqual(self.stored_ids(), ["a", "b"])
+
+    def test_failed_synchronous_write_is_retried_by_the_next_save(self):
+        data_manager = self.open_manager()
+        self.fail_writes(data_manager, 1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            data_manager.add_reminder(reminder("a"))
+        self.assertTrue(data_manager.is_dirty("reminders"))
+        data_manager.add_reminder(reminder("b"))
+        self.assertEqual(self.stored_ids(), ["a", "b"])
+
+    def test_close_flushes_queued_writes(self):
+        data_manager = self.open_manager(write_behind=True)
+        data_manager.add_reminder(reminder("a"))
+        data_manager.add_completed_entry("a")
+        self.assertEqual(self.stored_ids(), [])
+        data_manager.close()
+        reopened = self.open_manager()
+        self.assertEqual([record["id"] for record in reopened.get_reminders()], ["a"])
+        self.assertIsNotNone(reopened.get_last_completed("a"))
+
+    def test_close_retries_a_failed_flush(self):
+        data_manager = self.open_manager(write_behind=True)
+        data_manager.add_reminder(reminder("a"))
+        self.fail_writes(data_manager, 1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            data_manager.close()
+        self.assertEqual(self.stored_ids(), ["a"])
+
+
+class TransactionRollback:
+    """A failed transaction() leaves 'reminders' and 'completed' untouched, in memory and on disk"""
+
+    backend = None
+
+    def setUp(self):
+        super().setUp()
+        self.data_manager = self.open_manager(backend=self.backend)
+        for reminder_id in ("a", "b"):
+            self.data_manager.add_reminder(reminder(reminder_id))
+        self.data_manager.add_completed_entry("a")
+        self.before = self.state(self.data_manager)
+
+    @staticmethod
+    def state(data_manager):
+        return ([dict(record) for record in data_manager.get_reminders()],
+                [dict(record) for record in data_manager.get_completed()],
+                [(compiled.id, compiled.source.get("text"), compiled.completed_epoch)
+                 for compiled in data_manager.get_compiled_reminders()])
+
+    def reopened_state(self):
+        self.data_manager.close()
+        return self.state(self.open_manager(backend=self.backend))
+
+    def mutate(self):
+        self.data_manager.update_reminder("a", dict(reminder("a"), text="edited"))
+        self.data_manager.add_reminder(reminder("c"))
+        self.data_manager.remove_reminder("b")
+        self.data_manager.add_completed_entry("c")
+        self.data_manager.remove_completed_entry("a")
+
+    def test_rollback(self):
+        notified = []
+        for data_type in ("reminders", "completed"):
+            self.data_manager.subscribe(data_type, lambda _, data_type=data_type: notified.append(data_type))
+        with self.assertRaises(RuntimeError):
+            with self.data_manager.transaction():
+                self.mutate()
+                with self.data_manager.transaction():
+                    self.data_manager.add_completed_entry("a")
+                raise RuntimeError("abort")
+        self.assertEqual(notified, [])
+        self.assertEqual(self.state(self.data_manager), self.before)
+        self.assertFalse(self.data_manager.is_dirty("reminders"))
+        self.assertFalse(self.data_manager.is_dirty("completed"))
+        self.assertEqual(self.reopened_state(), self.before)
+
+    def test_commit(self):
+        with self.data_manager.transaction():
+            self.mutate()
+        after = self.state(self.data_manager)
+        self.assertEqual([record["id"] for record in after[0]], ["a", "c"])
+        self.assertEqual([record["id"] for record in after[1]], ["c"])
+        self.assertEqual(self.reopened_state(), after)
+
+
+class JsonTransactionTest(TransactionRollback, DataManagerTestCase):
+    backend = "json"
+
+
+class JournalTransactionTest(TransactionRollback, DataManagerTestCase):
+    backend = "journal"
+
+
+class SqliteTransactionTest(TransactionRollback, DataManagerTestCase):
+    backend = "sqlite"
+
+
+if __name__ == "__main__":
+    unittest.main()
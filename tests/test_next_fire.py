@@ -0,0 +1,191 @@
+import datetime
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agenda import iter_occurrences
+from reminder_check import ReminderChecker, CompiledReminder
+
+# Naive local datetimes only: no DST transitions are involved
+BOUNDARIES = [
+    datetime.datetime(2023, 12, 31, 23, 59),
+    datetime.datetime(2024, 1, 1, 0, 0),
+    datetime.datetime(2024, 2, 28, 23, 30),
+    datetime.datetime(2024, 2, 29, 12, 0),
+    datetime.datetime(2024, 3, 31, 23, 59),
+    datetime.datetime(2024, 4, 30, 0, 1),
+    datetime.datetime(2025, 2, 28, 23, 59),
+    datetime.datetime(2025, 6, 1, 6, 0),
+    datetime.datetime(2025, 12, 29, 8, 0),  # Monday
+]
+
+
+def random_time(rng):
+    return f"{rng.randint(0, 23):02d}:{rng.choice([0, 1, 30, 59, rng.randint(0, 59)]):02d}"
+
+
+def random_reminder(rng):
+    recurrence_type = rng.choice(["once", "daily", "weekly", "monthly", "yearly"])
+    reminder = {"id": "r", "text": "t", "recurrence_type": recurrence_type, "time": random_time(rng)}
+    if recurrence_type == "once":
+        day = datetime.date(2024, 1, 1) + datetime.timedelta(days=rng.randint(-30, 800))
+        reminder["date"] = day.isoformat()
+    elif recurrence_type == "weekly":
+        reminder["weekly_days"] = sorted(rng.sample(range(7), rng.randint(0, 3)))
+    elif recurrence_type == "monthly":
+        reminder["monthly_day"] = rng.choice([1, 15, 28, 29, 30, 31, rng.randint(1, 31)])
+    elif recurrence_type == "yearly":
+        reminder["yearly_month"] = rng.randint(1, 12)
+        reminder["yearly_day"] = rng.choice([1, 28, 29, 30, 31, rng.randint(1, 31)])
+    return reminder
+
+
+def random_after(rng):
+    if rng.random() < 0.5:
+        base = rng.choice(BOUNDARIES)
+    else:
+        base = datetime.datetime(2024, 1, 1) + datetime.timedelta(days=rng.randint(0, 730))
+    return base + datetime.timedelta(minutes=rng.randint(-90, 90))
+
+
+def random_completion(rng, after):
+    if rng.random() < 0.4:
+        return None
+    moment = after + datetime.timedelta(days=rng.choice([-400, -40, -7, -1, 0, 0, 0]),
+                                        minutes=rng.randint(-600, 600))
+    return moment.isoformat()
+
+
+class NextFireTimeTest(unittest.TestCase):
+    """next_fire_time must be the earliest instant at or after `after` where is_due is true"""
+
+    SAMPLES = 3000
+    HORIZON_DAYS = 3 * 366  # how far a "never fires" answer is checked
+
+    def assert_earliest(self, reminder, after, completed_at):
+        fire_time = ReminderChecker.next_fire_time(reminder, after, completed_at)
+        context = f"{reminder} after={after} completed_at={completed_at} -> {fire_time}"
+
+        def due(moment):
+            return ReminderChecker.is_due(reminder, moment, completed_at)
+
+        # is_due only changes at minute and day boundaries and, within a day, stays
+        # true once it became true, so checking the last minute of each day before the
+        # result and the minute before the result covers every earlier instant
+        end = fire_time if fire_time is not None else after + datetime.timedelta(days=self.HORIZON_DAYS)
+        day = after.date()
+        while day < end.date():
+            self.assertFalse(due(datetime.datetime.combine(day, datetime.time(23, 59))), context)
+            day += datetime.timedelta(days=1)
+        if fire_time is None:
+            return
+        self.assertGreaterEqual(fire_time, after, context)
+        self.assertTrue(due(fire_time), context)
+        before = fire_time.replace(second=0, microsecond=0) - datetime.timedelta(minutes=1)
+        if fire_time > after and before >= after.replace(second=0, microsecond=0):
+            self.assertFalse(due(max(before, after)), context)
+
+    def test_random_schedules(self):
+        rng = random.Random(20240229)
+        for _ in range(self.SAMPLES):
+            after = random_after(rng)
+            reminder = random_reminder(rng)
+            self.assert_earliest(reminder, after, random_completion(rng, after))
+
+    def test_seconds_in_after(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            after = random_after(rng).replace(second=rng.randint(0, 59), microsecond=rng.randint(0, 999999))
+            self.assert_earliest(random_reminder(rng), after, random_completion(rng, after))
+
+    def test_month_end_days(self):
+        for monthly_day in (29, 30, 31):
+            reminder = {"recurrence_type": "monthly", "monthly_day": monthly_day, "time": "09:00"}
+            for after in BOUNDARIES:
+                self.assert_earliest(reminder, after, None)
+                self.assert_earliest(reminder, after, after.isoformat())
+
+    def test_repeated_calls(self):
+        # The last answer is reused for `after` values between its `after` and fire time
+        rng = random.Random(99)
+        for _ in range(500):
+            reminder = random_reminder(rng)
+            after = random_after(rng)
+            completed_at = random_completion(rng, after)
+            completion = {"completed_at": completed_at} if completed_at else None
+            compiled = CompiledReminder(reminder, completion)
+            for _ in range(5):
+                self.assertEqual(compiled.next_fire_time(after),
+                                 CompiledReminder(reminder, completion).next_fire_time(after),
+                                 f"{reminder} after={after} completed_at={completed_at}")
+                after += datetime.timedelta(minutes=rng.choice([-1440, -1, 1, 59, 600, 1440, 40000]))
+
+    def test_invalid_input_never_fires(self):
+        after = datetime.datetime(2024, 5, 5, 12, 0)
+        for reminder in ({"recurrence_type": "daily", "time": "xx"},
+                         {"recurrence_type": "once", "date": "2024-13-01", "time": "10:00"},
+                         {"recurrence_type": "yearly", "yearly_month": 13, "time": "10:00"}):
+            self.assertIsNone(ReminderChecker.next_fire_time(reminder, after))
+            self.assert_earliest(reminder, after, None)
+
+
+class OccurrencesTest(unittest.TestCase):
+    """iter_occurrences must match a checker polling every minute and completing what fired"""
+
+    def test_random_windows(self):
+        rng = random.Random(1716)
+        for _ in range(60):
+            start = random_after(rng)
+            end = start + datetime.timedelta(days=3)
+            completed_at = random_completion(rng, start - datetime.timedelta(days=1))
+            completion = {"completed_at": completed_at} if completed_at else None
+            initial = CompiledReminder(random_reminder(rng), completion)
+
+            expected = []
+            compiled = initial
+            moment = start
+            while moment < end:
+                if compiled.is_due(moment):
+                    expected.append(moment)
+                    if compiled.recurrence_type == "once":
+                        break
+                    compiled = compiled.with_completion({"completed_at": moment.isoformat()})
+                moment = moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+            self.assertEqual(list(iter_occurrences(initial, start, end)), expected,
+                             f"{initial.source} start={start} completed_at={completed_at}")
+
+    def test_long_windows_follow_next_fire_time(self):
+        """The day-stepping path for daily/weekly reminders over windows the minute poll can't cover"""
+        rng = random.Random(1617)
+        for _ in range(400):
+            start = random_after(rng)
+            end = start + datetime.timedelta(days=rng.choice([1, 8, 40, 400]), minutes=rng.randint(0, 1440))
+            completed_at = random_completion(rng, start - datetime.timedelta(days=1))
+            completion = {"completed_at": completed_at} if completed_at else None
+            initial = CompiledReminder(random_reminder(rng), completion)
+
+            expected = []
+            compiled = initial
+            moment = compiled.next_fire_time(start)
+            while moment is not None and moment < end:
+                expected.append(moment)
+                if compiled.recurrence_type == "once":
+                    break
+                compiled = compiled.with_completion({"completed_at": moment.isoformat()})
+                moment = compiled.next_fire_time(moment)
+            self.assertEqual(list(iter_occurrences(initial, start, end)), expected,
+                             f"{initial.source} start={start} end={end} completed_at={completed_at}")
+
+    def test_end_is_exclusive(self):
+        start = datetime.datetime(2025, 1, 1, 8, 0)
+        end = datetime.datetime(2025, 1, 31, 9, 0)
+        daily = {"recurrence_type": "daily", "time": "09:00"}
+        weekly = {"recurrence_type": "weekly", "time": "09:00", "weekly_days": [4]}  # Fridays
+        self.assertEqual(len(list(iter_occurrences(daily, start, end))), 30)
+        self.assertEqual(list(iter_occurrences(weekly, start, end))[-1], datetime.datetime(2025, 1, 24, 9, 0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import JournalStorage
+from utils import backup_path, load_json, repair_torn_line, save_json
+
+
+class JournalTornLineTest(unittest.TestCase):
+    """A partial last line left by a crash must not swallow the next append"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.file_paths = {"reminders": os.path.join(self.directory.name, "notify.json")}
+        self.journal_path = self.file_paths["reminders"] + ".journal"
+
+    def open_storage(self):
+        storage = JournalStorage(self.file_paths, {"journal_compact_interval_sec": 3600})
+        self.addCleanup(storage.close)
+        return storage
+
+    def test_append_after_torn_line_survives_compaction(self):
+        storage = self.open_storage()
+        storage.write("reminders", None, [{"op": "append", "record": {"id": "a"}}])
+        storage.close()
+        # Crash in the middle of the next append
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write('{"op": "append", "rec')
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            storage = self.open_storage()
+            self.assertEqual(storage.load("reminders"), [{"id": "a"}])
+            storage.write("reminders", None, [{"op": "append", "record": {"id": "b"}}])
+            storage.close()
+        self.assertEqual(self.open_storage().load("reminders"), [{"id": "a"}, {"id": "b"}])
+
+    def test_repair_keeps_complete_lines(self):
+        path = os.path.join(self.directory.name, "log.jsonl")
+        for content, expected in ((b"", b""), (b"1\n2\n", b"1\n2\n"), (b"1\n2\n3", b"1\n2\n"),
+                                  (b"partial", b""), (b"1\n" + b"x" * 10000, b"1\n")):
+            with open(path, 'wb') as f:
+                f.write(content)
+            with contextlib.redirect_stdout(io.StringIO()):
+                repair_torn_line(path)
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), expected)
+
+
+class SaveJsonBackupTest(unittest.TestCase):
+    """The backup always holds the last version that parsed"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "data.json")
+
+    def read_backup(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return load_json(backup_path(self.path))
+
+    def test_saved_version_becomes_backup(self):
+        save_json(self.path, [1])
+        save_json(self.path, [2])
+        self.assertEqual(self.read_backup(), [1])
+        self.assertEqual(load_json(self.path), [2])
+
+    def test_damaged_external_edit_is_not_backed_up(self):
+        save_json(self.path, [1])
+        save_json(self.path, [2])
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('[2, {"torn')
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_json(self.path, [3])
+        self.assertEqual(self.read_backup(), [1])
+        self.assertEqual(load_json(self.path), [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
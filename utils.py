@@ -1,15 +1,168 @@
 import json
 import os
+import shutil
+import tempfile
+
+# On-disk formats understood by save_json; load_json detects them automatically
+JSON_FORMATS = ("pretty", "compact", "jsonl")
+
+# Files known to parse: absolute path -> (size, mtime_ns) when load_json read it or save_json wrote it
+_known_good = {}
+
+def backup_path(file_path):
+    """Path of the last-known-good copy kept next to a JSON file."""
+    return file_path + ".bak"
 
 def load_json(file_path, default=None):
-    """Load data from a JSON file with UTF-8 encoding."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception:
+    """Load data from a JSON file with UTF-8 encoding, falling back to the backup if it is damaged."""
+    for path in (file_path, backup_path(file_path)):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = parse_json(f.read(), default)
+                if path == file_path:
+                    _mark_good(file_path, os.fstat(f.fileno()))
+            if path != file_path:
+                print(f"Warning: {file_path} is missing or damaged, restored from {path}")
+            return data
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            _known_good.pop(os.path.abspath(path), None)
+            print(f"Warning: Could not read {path}: {e}")
+    return default if default is not None else []
+
+def parse_json(text, default=None):
+    """Parse JSON or JSON Lines text (a list with one record per line)."""
+    if not text.strip():
         return default if default is not None else []
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        # A JSON Lines file is a valid JSON value followed by more lines
+        if e.msg != "Extra data":
+            raise
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def dump_json(data, fmt="pretty"):
+    """Serialize data in one of JSON_FORMATS."""
+    if fmt == "jsonl" and isinstance(data, list) and len(data) > 1:
+        return "".join(json.dumps(item, ensure_ascii=False, separators=(',', ':')) + "\n" for item in data)
+    if fmt in ("compact", "jsonl"):
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return json.dumps(data, indent=4, ensure_ascii=False)
+
+def save_json(file_path, data, fmt="pretty"):
+    """Atomically save data to a JSON file with UTF-8 encoding.
+
+    fmt is one of JSON_FORMATS: "pretty" (indented), "compact" (minified) or
+    "jsonl" (one record per line for lists of two or more records, so a
+    JSON Lines file can never be mistaken for a plain JSON value).
+    The data is written to a temporary file in the same directory, fsynced and
+    renamed over the target, so a crash never leaves a truncated file. The
+    previous version is rotated to the backup file first.
+    """
+    text = dump_json(data, fmt)
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(file_path):
+            _rotate_backup(file_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+    try:
+        _mark_good(file_path, os.stat(file_path))
+    except OSError:
+        pass
 
-def save_json(file_path, data):
-    """Save data to a JSON file with pretty printing and UTF-8 encoding."""
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
\ No newline at end of file
+def _mark_good(file_path, stat):
+    _known_good[os.path.abspath(file_path)] = (stat.st_size, stat.st_mtime_ns)
+
+def _is_known_good(file_path):
+    """Whether the file is unchanged since load_json parsed it or save_json wrote it"""
+    known = _known_good.get(os.path.abspath(file_path))
+    if known is None:
+        return False
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return False
+    return known == (stat.st_size, stat.st_mtime_ns)
+
+def _rotate_backup(file_path):
+    """Keep the current version as the backup if it is readable; a hard link avoids copying the data.
+
+    A damaged current file (e.g. the one load_json just recovered from the
+    backup) never replaces the last good backup. Files this process loaded or
+    saved and that are unchanged since are known to be good and not parsed again.
+    """
+    if not _is_known_good(file_path):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                parse_json(f.read())
+        except (OSError, ValueError) as e:
+            print(f"Warning: not backing up damaged {file_path}: {e}")
+            return
+    bak_path = backup_path(file_path)
+    tmp_bak_path = bak_path + ".tmp"
+    try:
+        if os.path.exists(tmp_bak_path):
+            os.remove(tmp_bak_path)
+        os.link(file_path, tmp_bak_path)
+    except OSError:
+        shutil.copy2(file_path, tmp_bak_path)
+    os.replace(tmp_bak_path, bak_path)
+
+def repair_torn_line(file_path):
+    """Cut an append-only line file back to its last complete line.
+
+    A crash in the middle of an append leaves a partial last line; the next
+    append would otherwise continue that line and be lost with it.
+    """
+    try:
+        with open(file_path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                return
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b"\n")
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            print(f"Warning: dropping torn last line of {file_path} ({end - position} bytes)")
+            f.truncate(position)
+            f.flush()
+            os.fsync(f.fileno())
+    except FileNotFoundError:
+        pass
+
+def _fsync_directory(directory):
+    """Persist the rename itself (POSIX only, Windows has no directory handles)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)